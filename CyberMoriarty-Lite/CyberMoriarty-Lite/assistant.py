@@ -1,81 +1,250 @@
 import re
+from functools import lru_cache
 
 # Very small rule-based Taglish assistant. Expandable later.
 
+# Intent -> phrases (regex fragments, matched case-insensitively as whole
+# words). Earlier intents win when a message matches several.
 INTENTS = {
-    'scan': [r'(?i)scan', r'(?i)check', r'(?i)tingnan', r'(?i)scan mo'],
-    'howto': [r'(?i)paano', r'(?i)how to', r'(?i)ano ang dapat'],
-    'greet': [r'(?i)hi', r'(?i)hello', r'(?i)kumusta'],
-    'thanks': [r'(?i)thanks', r'(?i)salamat']
+    'scan': [r'scan\w*', r'check\w*', r'tingnan', r'scan mo'],
+    'howto': [r'paano', r'how to', r'ano ang dapat'],
+    'greet': [r'hi', r'hello', r'kumusta'],
+    'thanks': [r'thanks', r'salamat']
 }
 
 
-def detect_intent(text: str):
-    """Detect user intent from input text using pattern matching"""
-    for intent, patterns in INTENTS.items():
-        for p in patterns:
-            if re.search(p, text):
-                return intent
-    return 'unknown'
+class IntentMatcher:
+    """
+    All intents compiled into one alternation with a named group per
+    intent, so a message is scanned once. The highest-priority intent
+    found anywhere in the message wins.
+    """
 
+    def __init__(self, intents):
+        self.intents = list(intents)
+        alternatives = [f"(?P<i{rank}>{'|'.join(intents[intent])})"
+                        for rank, intent in enumerate(self.intents)]
+        self._pattern = re.compile(r'\b(?:' + '|'.join(alternatives) + r')\b', re.IGNORECASE)
+        self._rank = {f'i{rank}': rank for rank in range(len(self.intents))}
 
-def explain_recon(recon_result: dict):
-    """Produce Taglish friendly explanation of reconnaissance results"""
-    parts = []
-    host = recon_result.get('host', 'unknown')
-    parts.append(f"Target: {host}")
+    def match(self, text):
+        best = None
+        for m in self._pattern.finditer(text):
+            rank = self._rank[m.lastgroup]
+            if rank == 0:
+                return self.intents[0]
+            if best is None or rank < best:
+                best = rank
+        return 'unknown' if best is None else self.intents[best]
 
-    if 'ip' in recon_result:
-        parts.append(f"IP address: {recon_result['ip']}")
-    else:
-        parts.append("Hindi ma-resolve ang domain — siguraduhin tama ang URL.")
+    def match_many(self, texts):
+        match = self.match
+        return [match(text) for text in texts]
 
-    if recon_result.get('uses_https'):
-        parts.append("✅ Gumagamit ng HTTPS — mas secure ang koneksyon.")
-    else:
-        parts.append("⚠️ Hindi naka-HTTPS. I-recommend na gumamit ng SSL/TLS para secure.")
 
-    server = recon_result.get('server') or recon_result.get('x_powered_by')
-    if server:
-        parts.append(f"Detected server/tech: {server}")
+_matcher = IntentMatcher(INTENTS)
 
-    if 'http_error' in recon_result:
-        parts.append(f"HTTP error: {recon_result['http_error']}")
 
+def detect_intent(text: str):
+    """Detect user intent from input text using pattern matching"""
+    return _matcher.match(text)
+
+
+def detect_intents(texts):
+    """detect_intent() for many messages, in order"""
+    return _matcher.match_many(texts)
+
+
+# Report text. Static lines are constants and the action-step block is
+# built once. Everything below a recon's host/IP lines, and the whole
+# security section, depend only on a few findings that repeat across
+# targets, so those texts are cached by their inputs.
+NO_IP = "Hindi ma-resolve ang domain — siguraduhin tama ang URL."
+USES_HTTPS = "✅ Gumagamit ng HTTPS — mas secure ang koneksyon."
+NO_HTTPS = "⚠️ Hindi naka-HTTPS. I-recommend na gumamit ng SSL/TLS para secure."
+PLAIN_HTTP_OPEN = "⚠️ May HTTPS pero bukas pa rin ang plain HTTP na walang redirect papuntang HTTPS."
+HEADERS_OK = "✅ Security headers OK (basic check)."
+ALL_CLEAR = "🎉 Walang immediate issues na nakita sa basic checks."
+NO_ADMIN_PAGES = "✅ Walang nakitang admin/login pages."
+NO_REFLECTED_XSS = "✅ Walang reflected XSS sa basic test."
+NO_OPEN_PORTS = "✅ Walang bukas na common ports."
+
+ACTION_STEPS = '\n'.join([
+    '\nAction steps (madali):',
+    '- Mag-install ng SSL certificate kung wala.',
+    '- Gumamit ng strong passwords and limit admin access.',
+    '- Update ang CMS o plugins regularly.',
+])
+
+# Distinct finding combinations kept per section
+REPORT_CACHE_SIZE = 4096
+
+
+def explain_recon(recon_result):
+    """Produce Taglish friendly explanation of reconnaissance results (a ReconResult)"""
+    host = recon_result.host or 'unknown'
+    ip = recon_result.ip
+    head = f"Target: {host}\nIP address: {ip}" if ip is not None else f"Target: {host}\n{NO_IP}"
+
+    schemes = recon_result.schemes or {}
+    plain, secure = schemes.get('http', {}), schemes.get('https', {})
+    plain_open = ('status_code' in plain and 'status_code' in secure
+                  and not plain.get('redirects_to_https'))
+    server = recon_result.server or recon_result.x_powered_by
+    return head + _recon_tail(bool(recon_result.uses_https), plain_open, server,
+                              recon_result.http_error)
+
+
+@lru_cache(maxsize=REPORT_CACHE_SIZE)
+def _recon_tail(uses_https, plain_open, server, http_error):
+    parts = ['', USES_HTTPS if uses_https else NO_HTTPS]
+    if plain_open:
+        parts.append(PLAIN_HTTP_OPEN)
+    if server:
+        parts.append(f"Detected server/tech: {server}")
+    if http_error:
+        parts.append(f"HTTP error: {http_error}")
     return '\n'.join(parts)
 
 
-def explain_scan_results(missing_headers, admin_pages, xss_possible):
-    """Provide Taglish explanation of security scan results"""
+def explain_scan_results(headers=None, admin=None, xss=None):
+    """
+    Provide Taglish explanation of security scan results: the
+    HeadersResult, AdminResult and XssResult of a scan.
+    A value of None means that check was not part of the scan.
+    """
+    if headers is not None and headers.error:
+        return f"Scan error: {headers.error}"
+    return _security_text(
+        tuple(headers.missing) if headers is not None else None,
+        tuple(admin.found) if admin is not None else (),
+        tuple(xss.params) if xss is not None else (),
+        tuple(admin.login_gated or ()) if admin is not None else (),
+    )
+
+
+@lru_cache(maxsize=REPORT_CACHE_SIZE)
+def _security_text(missing, admin_pages, params, login_gated=()):
     parts = []
-    
-    # Handle error cases
-    if isinstance(missing_headers, dict) and 'error' in missing_headers:
-        parts.append(f"Scan error: {missing_headers['error']}")
-        return '\n'.join(parts)
 
     # Security headers analysis
-    if not missing_headers:
-        parts.append("✅ Security headers OK (basic check).")
+    if missing is None:
+        pass
+    elif not missing:
+        parts.append(HEADERS_OK)
     else:
-        parts.append(f"⚠️ Missing security headers: {', '.join(missing_headers)}")
+        parts.append(_missing_headers_line(missing))
 
     # Admin pages detection
     if admin_pages:
-        parts.append(f"⚠️ Nakakita ng admin/login pages: {', '.join(admin_pages)} — siguraduhin secure ang access.")
+        parts.append(_admin_line(admin_pages))
+    if login_gated:
+        parts.append(_login_gated_line(login_gated))
 
-    # XSS vulnerability check
-    if xss_possible:
-        parts.append("⚠️ Posibleng reflected XSS (basic test). Iwasan ang mga hindi sanitized na inputs.")
+    # XSS vulnerability check (reflected parameter names)
+    if params:
+        parts.append(_xss_line(params))
 
     # All clear message
-    if not (missing_headers or admin_pages or xss_possible):
-        parts.append("🎉 Walang immediate issues na nakita sa basic checks.")
+    if not (missing or admin_pages or params or login_gated):
+        parts.append(ALL_CLEAR)
 
     # Provide actionable recommendations in Taglish
-    parts.append('\nAction steps (madali):')
-    parts.append('- Mag-install ng SSL certificate kung wala.')
-    parts.append('- Gumamit ng strong passwords and limit admin access.')
-    parts.append('- Update ang CMS o plugins regularly.')
+    parts.append(ACTION_STEPS)
 
     return '\n'.join(parts)
+
+
+def _missing_headers_line(missing):
+    return f"⚠️ Missing security headers: {', '.join(missing)}"
+
+
+def _admin_line(admin_pages):
+    return f"⚠️ Nakakita ng admin/login pages: {', '.join(admin_pages)} — siguraduhin secure ang access."
+
+
+def _login_gated_line(paths):
+    return f"🔒 Naka-redirect sa login page: {', '.join(paths)} — may admin area dito, siguraduhing malakas ang passwords."
+
+
+def _xss_line(params):
+    return f"⚠️ Posibleng reflected XSS sa parameter: {', '.join(params)} (basic test). Iwasan ang mga hindi sanitized na inputs."
+
+
+def explain_check(name, result):
+    """
+    Taglish text for one finished check (its typed result), for showing
+    results as they come in. None for checks without a text of their own.
+    """
+    if name == 'recon':
+        return explain_recon(result)
+    if name not in ('headers', 'admin', 'xss', 'ports'):
+        return None
+    if result.error:
+        return f"Scan error: {result.error}"
+    if name == 'headers':
+        return _missing_headers_line(result.missing) if result.missing else HEADERS_OK
+    if name == 'admin':
+        lines = [_admin_line(result.found) if result.found else NO_ADMIN_PAGES]
+        if result.login_gated:
+            lines.append(_login_gated_line(result.login_gated))
+        return '\n'.join(lines)
+    if name == 'xss':
+        return _xss_line(result.params) if result.params else NO_REFLECTED_XSS
+    if result.open:
+        return f"⚠️ Bukas na ports sa {result.address}: {', '.join(map(str, result.open))}"
+    return NO_OPEN_PORTS
+
+
+class Report:
+    """
+    Taglish explanations of one ScanRecord, rendered on first access and
+    then kept. Pickling renders it first, so a batch worker process pays
+    for the text rather than the parent, and only the text is sent.
+    """
+
+    __slots__ = ('_record', '_parts')
+
+    def __init__(self, record):
+        self._record = record
+        self._parts = {}
+
+    @property
+    def recon(self):
+        """'' if recon was not part of the scan"""
+        if 'recon' not in self._parts:
+            recon_data = self._record.get('recon')
+            self._parts['recon'] = explain_recon(recon_data) if recon_data is not None else ''
+        return self._parts['recon']
+
+    @property
+    def security(self):
+        if 'security' not in self._parts:
+            record = self._record
+            self._parts['security'] = explain_scan_results(record.get('headers'),
+                                                           record.get('admin'), record.get('xss'))
+        return self._parts['security']
+
+    def to_dict(self):
+        explanation = {}
+        if self.recon:
+            explanation['recon'] = self.recon
+        explanation['security'] = self.security
+        return explanation
+
+    def __getstate__(self):
+        return self.to_dict()
+
+    def __setstate__(self, parts):
+        self._record = None
+        self._parts = {'recon': parts.get('recon', ''), 'security': parts['security']}
+
+
+def annotate_result(record):
+    """
+    Attach a lazy Report to a ScanRecord (used as batch post-processing);
+    its text is only built when the record is serialized with prose.
+    """
+    if record.error is None:
+        record.explanation = Report(record)
+    return record
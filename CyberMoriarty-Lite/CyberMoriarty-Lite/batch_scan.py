@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+CyberMoriarty Lite - Batch Scanner
+Scan a whole inventory of domains and stream a summary line per target,
+or full JSON Lines records with --output
+"""
+
+import argparse
+import os
+import sys
+
+from assistant import annotate_result
+from core.batch import BatchScheduler, ShardedBatch
+from core.checks import result_types, select_checks
+from core.output import ColumnarWriter, JsonlWriter
+from core.store import ResultStore
+
+
+def summarize(record):
+    """One-line summary of a finished target (a ScanRecord)"""
+    if record.error is not None:
+        return f"{record.target}\tERROR\t{record.error}"
+
+    fields = [record.target]
+    recon_data = record.get('recon')
+    if recon_data is not None:
+        fields += [
+            recon_data.ip or '-',
+            str(recon_data.status_code or '-'),
+            f"https={'yes' if recon_data.uses_https else 'no'}",
+        ]
+    headers = record.get('headers')
+    if headers is not None:
+        fields.append(f"missing_headers={'error' if headers.error else len(headers.missing)}")
+    admin = record.get('admin')
+    if admin is not None:
+        fields.append(f"admin={','.join(admin.found) or '-'}")
+    xss = record.get('xss')
+    if xss is not None:
+        fields.append(f"xss={','.join(xss.params) or 'no'}")
+    ports = record.get('ports')
+    if ports is not None:
+        fields.append(f"ports={','.join(map(str, ports.open)) or '-'}")
+    return '\t'.join(fields)
+
+
+def show_progress(done, total, record):
+    print(f"[{done}/{total}] {record.target}", file=sys.stderr)
+
+
+def parse_max_age(values):
+    """['headers=3600', 'admin=86400'] -> {'headers': 3600.0, 'admin': 86400.0}"""
+    max_age = {}
+    for value in values or []:
+        name, _, seconds = value.partition('=')
+        max_age[name.strip()] = float(seconds)
+    return max_age
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Batch scan many targets')
+    parser.add_argument('targets', help="file with one domain/URL per line ('-' for stdin)")
+    parser.add_argument('--concurrency', type=int, default=20,
+                        help='targets scanned at once (default: 20)')
+    parser.add_argument('--per-host', type=int, default=2,
+                        help='targets scanned at once per resolved address (default: 2)')
+    parser.add_argument('--rate', type=float, default=None,
+                        help='max scans started per second per address')
+    parser.add_argument('--no-dedupe', action='store_true',
+                        help='scan duplicate hosts again')
+    parser.add_argument('--no-share', action='store_true',
+                        help='run IP-level checks (ports) for every host, even when hosts '
+                             'share an address')
+    parser.add_argument('-o', '--output',
+                        help="write one JSON record per target to this file ('-' for stdout)")
+    parser.add_argument('--columns', metavar='FILE',
+                        help="also write all results column by column as one JSON object "
+                             "{'<check>.<field>': [...]} when the batch ends")
+    parser.add_argument('--resume', action='store_true',
+                        help='append to --output and skip targets already in it')
+    parser.add_argument('--checks',
+                        help='comma-separated checks to run (default: recon,headers,admin,xss)')
+    parser.add_argument('--store', help='SQLite file that keeps per-check results between runs')
+    parser.add_argument('--incremental', action='store_true',
+                        help='reuse results in --store that are still fresh')
+    parser.add_argument('--max-age', action='append', metavar='CHECK=SECONDS',
+                        help='freshness window for one check (repeatable)')
+    parser.add_argument('--wordlist', metavar='FILE',
+                        help='admin path wordlist (one path per line) instead of the built-in list')
+    parser.add_argument('--processes', type=int, default=1,
+                        help='shard targets over this many worker processes; results keep '
+                             'input order (default: 1)')
+    parser.add_argument('--explain', action='store_true',
+                        help='add Taglish explanations to each record (built in the workers)')
+    parser.add_argument('--quiet', action='store_true', help='no progress on stderr')
+    args = parser.parse_args(argv)
+
+    if args.resume and (not args.output or args.output == '-'):
+        parser.error('--resume needs an --output file')
+    if args.columns == '-' and args.output == '-':
+        parser.error('only one of --output and --columns can go to stdout')
+    if args.incremental and not args.store:
+        parser.error('--incremental needs a --store file')
+    try:
+        max_age = parse_max_age(args.max_age)
+    except ValueError:
+        parser.error('--max-age expects CHECK=SECONDS')
+    try:
+        checks = select_checks(args.checks)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.wordlist and not os.path.isfile(args.wordlist):
+        parser.error(f'wordlist not found: {args.wordlist}')
+
+    targets = sys.stdin if args.targets == '-' else args.targets
+    writer = JsonlWriter(args.output, resume=args.resume) if args.output else None
+    columns = ColumnarWriter(args.columns, result_types(checks)) if args.columns else None
+    if writer and writer.completed and not args.quiet:
+        print(f"Resuming: {len(writer.completed)} targets already done", file=sys.stderr)
+
+    options = dict(
+        concurrency=args.concurrency,
+        per_host=args.per_host,
+        rate=args.rate,
+        dedupe=not args.no_dedupe,
+        share=not args.no_share,
+        skip=writer.completed if writer else None,
+        incremental=args.incremental,
+        max_age=max_age,
+        checks=checks,
+        wordlist=args.wordlist,
+        progress=None if args.quiet else show_progress,
+    )
+    store = None
+    if args.processes > 1:
+        # Every worker opens the store file itself
+        scheduler = ShardedBatch(processes=args.processes, store=args.store,
+                                 postprocess=annotate_result if args.explain else None,
+                                 **options)
+    else:
+        store = ResultStore(args.store) if args.store else None
+        scheduler = BatchScheduler(store=store, **options)
+
+    try:
+        for result in scheduler.run(targets):
+            if args.explain and args.processes <= 1:
+                annotate_result(result)
+            if columns:
+                columns.write(result)
+            if writer:
+                writer.write(result.to_dict())
+            elif args.columns != '-':
+                print(summarize(result), flush=True)
+    except KeyboardInterrupt:
+        print('\nBatch scan stopped.', file=sys.stderr)
+        return 130
+    finally:
+        if writer:
+            writer.close()
+        if columns:
+            columns.close()
+        if store:
+            store.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark: intent detection per message, old pattern loop vs the compiled matcher.
+
+- loop:     re.search with each string pattern in turn (the old detect_intent)
+- matcher:  assistant.detect_intent, one compiled regex and one pass
+- batch:    assistant.detect_intents over the whole message list
+
+Usage: python benchmarks/bench_intent.py [--messages N] [--rounds N]
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from assistant import detect_intent, detect_intents
+
+# The patterns detect_intent used to try one by one
+LEGACY_INTENTS = {
+    'scan': [r'(?i)scan', r'(?i)check', r'(?i)tingnan', r'(?i)scan mo'],
+    'howto': [r'(?i)paano', r'(?i)how to', r'(?i)ano ang dapat'],
+    'greet': [r'(?i)hi', r'(?i)hello', r'(?i)kumusta'],
+    'thanks': [r'(?i)thanks', r'(?i)salamat']
+}
+
+SAMPLES = [
+    'scan mo nga example.com',
+    'Paano ko ise-secure yung admin page namin?',
+    'hello po',
+    'salamat sa tulong!',
+    'pwede bang tingnan ang https://shop.example.ph',
+    'ano ang dapat gawin kapag walang HTTPS yung site',
+    'I think this one is broken, the report says nothing useful about it',
+    'kumusta, may tanong lang ako tungkol sa CSP at X-Frame-Options headers',
+]
+
+
+def legacy_detect_intent(text):
+    for intent, patterns in LEGACY_INTENTS.items():
+        for p in patterns:
+            if re.search(p, text):
+                return intent
+    return 'unknown'
+
+
+def timed(fn, rounds):
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--messages', type=int, default=20000)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    messages = [rng.choice(SAMPLES) for _ in range(args.messages)]
+
+    modes = {
+        'loop': lambda: [legacy_detect_intent(m) for m in messages],
+        'matcher': lambda: [detect_intent(m) for m in messages],
+        'batch': lambda: detect_intents(messages),
+    }
+    print(f"{'mode':<8} {'total (s)':>10} {'per msg (us)':>13} {'speedup':>8}")
+    baseline = None
+    for mode, fn in modes.items():
+        elapsed = timed(fn, args.rounds)
+        baseline = baseline or elapsed
+        print(f"{mode:<8} {elapsed:>10.4f} {elapsed / len(messages) * 1e6:>13.2f} "
+              f"{baseline / elapsed:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
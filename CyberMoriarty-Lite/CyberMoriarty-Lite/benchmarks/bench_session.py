@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark: connection handshakes and wall time with and without a shared ScanSession.
+
+Starts a local keep-alive MockTarget that counts accepted TCP connections,
+then runs recon + header/admin/XSS checks against it in four modes:
+- bare:     every probe is a standalone requests.get (the old behaviour)
+- per-call: each check opens its own temporary pool (session=None)
+- pooled:   one ScanSession reused by every check, response cache off
+- shared:   one ScanSession with the fetch-once response cache
+
+Usage: python benchmarks/bench_session.py [--rounds N] [--latency MS] [--handshake MS]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.recon import recon
+from core.scanner import check_security_headers, find_admin_pages, quick_xss_reflection_test
+from core.session import ScanSession
+from mock_server import MockTarget
+
+
+class BareSession(ScanSession):
+    """Session that sends every probe with a standalone requests call and no cache"""
+
+    def __init__(self):
+        super().__init__(cache=False)
+
+    def request(self, method, url, timeout=None, **kwargs):
+        return requests.request(method, url, timeout=timeout or self.timeout, **kwargs)
+
+
+def scan_once(target, session):
+    recon(target, session=session)
+    check_security_headers(target, session=session)
+    find_admin_pages(target, session=session)
+    quick_xss_reflection_test(target, session=session)
+
+
+def run_mode(mock, mode, rounds):
+    target = mock.host
+    mock.reset_stats()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        if mode == 'bare':
+            with BareSession() as session:
+                scan_once(target, session)
+        elif mode == 'per-call':
+            scan_once(target, None)
+        elif mode == 'pooled':
+            with ScanSession(cache=False) as session:
+                scan_once(target, session)
+        else:
+            with ScanSession() as session:
+                scan_once(target, session)
+    elapsed = time.perf_counter() - start
+    stats = mock.stats()
+    return stats.get('connections', 0), stats.get('requests', 0), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='server-side delay per request in milliseconds')
+    parser.add_argument('--handshake', type=float, default=20.0,
+                        help='simulated connection setup cost in milliseconds')
+    args = parser.parse_args()
+
+    mock = MockTarget(latency=args.latency / 1000, handshake=args.handshake / 1000,
+                      open_ports=0, closed_ports=0)
+
+    print(f"{'mode':<10} {'handshakes':>11} {'requests':>9} {'wall (s)':>9} {'per scan':>9}")
+    for mode in ('bare', 'per-call', 'pooled', 'shared'):
+        conns, reqs, elapsed = run_mode(mock, mode, args.rounds)
+        print(f"{mode:<10} {conns:>11} {reqs:>9} {elapsed:>9.3f} {conns / args.rounds:>9.1f}")
+
+    mock.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,257 @@
+"""
+Local, configurable mock target for offline benchmarks.
+
+MockTarget starts a keep-alive HTTP server on 127.0.0.1 (or another
+loopback address) plus a set of
+open, closed and filtered TCP ports, and counts what the scanner does
+to it (connections, requests per path, bytes sent).
+
+    with MockTarget(latency=0.01, admin_paths=['/admin']) as target:
+        recon(target.host)
+        print(target.stats())
+"""
+
+import socket
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# Headers sent when security_headers=True
+SECURITY_HEADER_VALUES = {
+    'X-Frame-Options': 'DENY',
+    'Content-Security-Policy': "default-src 'self'",
+    'X-Content-Type-Options': 'nosniff',
+    'Strict-Transport-Security': 'max-age=31536000',
+    'X-XSS-Protection': '1; mode=block',
+}
+
+
+class MockHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # socketserver's default backlog of 5 drops SYNs under probe bursts (1s retransmit stalls)
+    request_queue_size = 128
+
+    def __init__(self, address, handler, target):
+        super().__init__(address, handler)
+        self.target = target
+
+    def handle_error(self, request, client_address):
+        # Scanners close streamed responses early; a reset is not a server bug
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+    def get_request(self):
+        conn = super().get_request()
+        self.target._count('connections')
+        return conn
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    server_version = 'MockTarget/1.0'
+
+    def setup(self):
+        super().setup()
+        # Loopback connects are free; model the cost of a real TCP+TLS setup
+        if self.server.target.handshake:
+            time.sleep(self.server.target.handshake)
+
+    def handle(self):
+        # https:// probes land on this plain-HTTP port; drop the TLS handshake
+        # at once, as a host without HTTPS would, instead of parsing it as HTTP
+        if self.connection.recv(1, socket.MSG_PEEK) == b'\x16':
+            return
+        super().handle()
+
+    def do_GET(self):
+        self._respond(send_body=True)
+
+    def do_HEAD(self):
+        if not self.server.target.head:
+            self.server.target._count('requests')
+            return self._send(405, b'', send_body=False)
+        self._respond(send_body=False)
+
+    def _respond(self, send_body):
+        target = self.server.target
+        parts = urlsplit(self.path)
+        path = parts.path or '/'
+        target._count('requests')
+        target._count_path(path)
+        if target.latency:
+            time.sleep(target.latency)
+
+        if path == '/' and target.redirects:
+            return self._send(302, b'', location='/hop/1', send_body=send_body)
+        if path.startswith('/hop/'):
+            hop = int(path.rsplit('/', 1)[1])
+            if hop < target.redirects:
+                return self._send(302, b'', location=f'/hop/{hop + 1}', send_body=send_body)
+            path = '/'
+
+        if path == '/':
+            params = parse_qs(parts.query)
+            reflected = ''.join(v[0] for k, v in params.items() if k in target.reflect_params)
+            half = target.body_size // 2
+            body = b'a' * half + reflected.encode() + b'a' * (target.body_size - half)
+            return self._send(200, body, send_body=send_body)
+
+        if path in target.admin_paths:
+            return self._send(200, b'<form>login</form>' + b'a' * target.admin_body_size,
+                              send_body=send_body)
+        if path in target.admin_redirects:
+            return self._send(302, b'', location=target.admin_redirects[path], send_body=send_body)
+        if target.catch_all:
+            # Soft 404: a "normal" page that echoes the missing path
+            body = b'<h1>Page ' + path.encode() + b' not found</h1>' + b'a' * 512
+            return self._send(200, body, send_body=send_body)
+        return self._send(404, b'not found', send_body=send_body)
+
+    def _send(self, status, body, location=None, send_body=True):
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if location:
+            self.send_header('Location', location)
+        if self.server.target.security_headers:
+            for name, value in SECURITY_HEADER_VALUES.items():
+                self.send_header(name, value)
+        self.end_headers()
+        if send_body and body:
+            self.wfile.write(body)
+            self.server.target._count('bytes_sent', len(body))
+
+    def log_message(self, *args):
+        pass
+
+
+class MockTarget:
+    """
+    Configurable local target.
+
+    - latency:         server delay per request (seconds)
+    - handshake:       simulated per-connection setup cost (seconds)
+    - body_size:       bytes in the root page
+    - redirects:       hops before the root page ('/' -> /hop/1 -> ... -> page)
+    - admin_paths:     paths answering 200; everything else is 404
+    - admin_redirects: {path: location} answering 302
+    - reflect_params:  query parameters echoed into the root page
+    - security_headers: send all headers the header check looks for
+    - catch_all:       answer unknown paths with 200 and a soft-404 page
+    - head:            answer HEAD like GET (False: 405, as some servers do)
+    - open_ports / closed_ports / filtered_ports: how many of each to create
+    - address:         loopback address to listen on (127.0.0.2 etc. look like other hosts)
+    """
+
+    def __init__(self, latency=0.0, handshake=0.0, body_size=2048, redirects=0,
+                 admin_paths=('/admin', '/login'), admin_redirects=None, admin_body_size=4096,
+                 reflect_params=('q',), security_headers=False, catch_all=False, head=True,
+                 open_ports=2, closed_ports=2, filtered_ports=0, address='127.0.0.1'):
+        self.address = address
+        self.latency = latency
+        self.handshake = handshake
+        self.body_size = body_size
+        self.redirects = redirects
+        self.admin_paths = set(admin_paths)
+        self.admin_redirects = dict(admin_redirects or {})
+        self.admin_body_size = admin_body_size
+        self.reflect_params = set(reflect_params)
+        self.security_headers = security_headers
+        self.catch_all = catch_all
+        self.head = head
+
+        self._lock = threading.Lock()
+        self._stats = Counter()
+        self._paths = Counter()
+        self._sockets = []
+
+        self.server = MockHTTPServer((self.address, 0), MockHandler, self)
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+        self.ports = {
+            'open': [self._open_port() for _ in range(open_ports)],
+            'closed': [self._closed_port() for _ in range(closed_ports)],
+            'filtered': [self._filtered_port() for _ in range(filtered_ports)],
+        }
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    @property
+    def host(self):
+        return f'{self.address}:{self.port}'
+
+    @property
+    def url(self):
+        return f'http://{self.host}'
+
+    def all_ports(self):
+        return self.ports['open'] + self.ports['closed'] + self.ports['filtered']
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['paths'] = dict(self._paths)
+        return stats
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats.clear()
+            self._paths.clear()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+        for sock in self._sockets:
+            sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self._stats[key] += amount
+
+    def _count_path(self, path):
+        with self._lock:
+            self._paths[path] += 1
+
+    def _open_port(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind((self.address, 0))
+        sock.listen(128)
+        self._sockets.append(sock)
+        return sock.getsockname()[1]
+
+    def _closed_port(self):
+        # Bind to get a free port number, then release it: connects get RST
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind((self.address, 0))
+        port = sock.getsockname()[1]
+        sock.close()
+        return port
+
+    def _filtered_port(self):
+        # A listener with a full accept backlog silently drops new SYNs,
+        # which looks like a firewalled port to the scanner
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind((self.address, 0))
+        sock.listen(0)
+        port = sock.getsockname()[1]
+        self._sockets.append(sock)
+        for _ in range(4):
+            filler = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            filler.setblocking(False)
+            filler.connect_ex((self.address, port))
+            self._sockets.append(filler)
+        time.sleep(0.05)
+        return port
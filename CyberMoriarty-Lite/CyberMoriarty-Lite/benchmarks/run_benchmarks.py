@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite for the scanner.
+
+Runs recon, every core.scanner check and the full pipeline against a local
+MockTarget and reports throughput, p50/p99 latency, requests per operation
+and peak Python memory. No network access is needed.
+
+Usage:
+    python benchmarks/run_benchmarks.py                       # all scenarios
+    python benchmarks/run_benchmarks.py -k admin -k pipeline  # a subset
+    python benchmarks/run_benchmarks.py --save base.json      # keep a baseline
+    python benchmarks/run_benchmarks.py --compare base.json   # exit 1 on regression
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.pipeline import scan_target
+from core.recon import recon
+from core.scanner import (
+    check_security_headers,
+    find_admin_pages,
+    port_scan_common,
+    quick_xss_reflection_test,
+)
+from mock_server import MockTarget
+
+
+def scenarios(args):
+    """name -> callable(target) performing one operation"""
+    return {
+        'recon': lambda t: recon(t.host),
+        'headers': lambda t: check_security_headers(t.host),
+        'admin': lambda t: find_admin_pages(t.host),
+        'xss': lambda t: quick_xss_reflection_test(t.host),
+        'ports': lambda t: port_scan_common('127.0.0.1', timeout=args.port_timeout,
+                                            ports=t.all_ports()),
+        'pipeline': lambda t: scan_target(t.host),
+    }
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100.0 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def run_scenario(name, op, target, iterations, warmup):
+    for _ in range(warmup):
+        op(target)
+
+    target.reset_stats()
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        op(target)
+        latencies.append(time.perf_counter() - t0)
+    total = time.perf_counter() - start
+    stats = target.stats()
+
+    # Memory is measured on a separate pass so tracing does not skew timings
+    tracemalloc.start()
+    op(target)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'name': name,
+        'iterations': iterations,
+        'throughput': iterations / total,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'requests_per_op': stats.get('requests', 0) / iterations,
+        'connections_per_op': stats.get('connections', 0) / iterations,
+        'kib_sent_per_op': stats.get('bytes_sent', 0) / iterations / 1024,
+        'peak_mem_kib': peak / 1024,
+    }
+
+
+def print_table(rows):
+    header = (f"{'scenario':<10} {'ops/s':>8} {'p50 ms':>8} {'p99 ms':>8} "
+              f"{'req/op':>7} {'conn/op':>8} {'KiB/op':>8} {'peak KiB':>9}")
+    print(header)
+    print('-' * len(header))
+    for r in rows:
+        print(f"{r['name']:<10} {r['throughput']:>8.1f} {r['p50_ms']:>8.1f} {r['p99_ms']:>8.1f} "
+              f"{r['requests_per_op']:>7.1f} {r['connections_per_op']:>8.1f} "
+              f"{r['kib_sent_per_op']:>8.1f} {r['peak_mem_kib']:>9.0f}")
+
+
+def compare(rows, baseline_path, tolerance):
+    """Return regression messages versus a saved run"""
+    with open(baseline_path, encoding='utf-8') as fh:
+        baseline = {r['name']: r for r in json.load(fh)['results']}
+
+    problems = []
+    for r in rows:
+        base = baseline.get(r['name'])
+        if not base:
+            continue
+        if r['p50_ms'] > base['p50_ms'] * (1 + tolerance) and r['p50_ms'] - base['p50_ms'] > 1:
+            problems.append(f"{r['name']}: p50 {base['p50_ms']:.1f} -> {r['p50_ms']:.1f} ms")
+        if r['requests_per_op'] > base['requests_per_op'] + 0.5:
+            problems.append(f"{r['name']}: requests/op {base['requests_per_op']:.1f} -> "
+                            f"{r['requests_per_op']:.1f}")
+        if r['peak_mem_kib'] > base['peak_mem_kib'] * (1 + tolerance) + 64:
+            problems.append(f"{r['name']}: peak memory {base['peak_mem_kib']:.0f} -> "
+                            f"{r['peak_mem_kib']:.0f} KiB")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Offline scanner benchmarks')
+    parser.add_argument('-k', '--scenario', action='append',
+                        help='run only this scenario (repeatable)')
+    parser.add_argument('-n', '--iterations', type=int, default=20)
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--latency', type=float, default=5.0, help='server delay per request, ms')
+    parser.add_argument('--handshake', type=float, default=0.0, help='per-connection cost, ms')
+    parser.add_argument('--body-size', type=int, default=64 * 1024, help='root page bytes')
+    parser.add_argument('--redirects', type=int, default=1, help='redirect hops before the root page')
+    parser.add_argument('--filtered-ports', type=int, default=1)
+    parser.add_argument('--port-timeout', type=float, default=0.5)
+    parser.add_argument('--save', help='write results as JSON')
+    parser.add_argument('--compare', help='baseline JSON to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed relative slowdown for --compare (default 0.25)')
+    args = parser.parse_args(argv)
+
+    available = scenarios(args)
+    selected = args.scenario or list(available)
+    unknown = [s for s in selected if s not in available]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    config = {
+        'latency': args.latency / 1000,
+        'handshake': args.handshake / 1000,
+        'body_size': args.body_size,
+        'redirects': args.redirects,
+        'filtered_ports': args.filtered_ports,
+    }
+    rows = []
+    with MockTarget(**config) as target:
+        for name in selected:
+            rows.append(run_scenario(name, available[name], target, args.iterations, args.warmup))
+    print_table(rows)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as fh:
+            json.dump({'config': config, 'results': rows}, fh, indent=2)
+
+    if args.compare:
+        problems = compare(rows, args.compare, args.tolerance)
+        if problems:
+            print('\nRegressions:')
+            for p in problems:
+                print('  ' + p)
+            return 1
+        print('\nNo regressions against', args.compare)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
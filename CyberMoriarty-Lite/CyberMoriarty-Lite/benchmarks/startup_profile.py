@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Startup profile: import time of each entry point, checked against a budget.
+
+Every entry module is imported in a fresh interpreter with -X importtime
+(nothing runs, the entry points keep their work under __main__). The
+report lists the total import time and the slowest modules below it.
+Exits 1 if an entry point is over its budget or imports a module that
+should wait for the first scan, so CI can fail on cold-start regressions.
+
+Usage: python benchmarks/startup_profile.py [--budget ENTRY=MS] [--top N] [--rounds N]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# entry module -> default budget (ms) on top of a bare interpreter start
+BUDGETS = {
+    'simple_main': 30.0,
+    'main': 1500.0,
+    'batch_scan': 400.0,
+    'web_app': 800.0,
+}
+
+# Modules an interactive entry point must not import before the first scan
+DEFERRED = {
+    'simple_main': ('requests', 'asyncio', 'core.pipeline'),
+    'main': ('requests', 'asyncio', 'core.pipeline'),
+}
+
+
+def import_times(module):
+    """
+    [(module, self_us, cumulative_us, depth)] from `python -X importtime`,
+    or raises RuntimeError with the interpreter's error output.
+    """
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                          cwd=ROOT, capture_output=True, text=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative), depth))
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    return rows
+
+
+def profile(module, rounds=3):
+    """
+    Best of `rounds` runs: (total_ms, rows) where rows are only the
+    imports made by `module` (not the interpreter's own start-up).
+    """
+    best = None
+    for _ in range(rounds):
+        rows = import_times(module)
+        # -X importtime lists a module after everything it imported
+        end = max(i for i, row in enumerate(rows) if row[0] == module and row[3] == 0)
+        start = end
+        while start > 0 and rows[start - 1][3] > 0:
+            start -= 1
+        total = rows[end][2] / 1000
+        if best is None or total < best[0]:
+            best = (total, rows[start:end + 1])
+    return best
+
+
+def parse_budgets(values):
+    """['main=800'] -> {'main': 800.0}, on top of BUDGETS"""
+    budgets = dict(BUDGETS)
+    for value in values or []:
+        name, _, ms = value.partition('=')
+        budgets[name.strip()] = float(ms)
+    return budgets
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('entries', nargs='*', help='entry modules (default: all in BUDGETS)')
+    parser.add_argument('--budget', action='append', metavar='ENTRY=MS',
+                        help='import budget for one entry point in ms (repeatable)')
+    parser.add_argument('--top', type=int, default=8, help='slowest modules to list per entry')
+    parser.add_argument('--rounds', type=int, default=3, help='runs per entry, best one counts')
+    args = parser.parse_args(argv)
+
+    try:
+        budgets = parse_budgets(args.budget)
+    except ValueError:
+        parser.error('--budget expects ENTRY=MS')
+
+    failed = False
+    for entry in args.entries or list(BUDGETS):
+        budget = budgets.get(entry)
+        try:
+            total, rows = profile(entry, args.rounds)
+        except RuntimeError as e:
+            # e.g. Kivy is not installed on this machine
+            print(f"{entry:<12} SKIPPED  {e}")
+            continue
+
+        imported = {name for name, _, _, _ in rows}
+        early = [m for m in DEFERRED.get(entry, ()) if m in imported]
+        over = budget is not None and total > budget
+        failed = failed or over or bool(early)
+        verdict = 'OVER' if over else 'ok'
+        print(f"{entry:<12} {total:>8.1f} ms  budget {budget if budget is not None else '-':>6}  {verdict}")
+        if early:
+            print(f"  imported at startup (should wait for the first scan): {', '.join(early)}")
+        for name, self_us, cumulative, depth in sorted(rows, key=lambda r: -r[1])[:args.top]:
+            print(f"  {self_us / 1000:>8.2f} ms self  {cumulative / 1000:>8.2f} ms total  {name}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,352 @@
+# Batch scanning of many targets
+# Targets are de-duplicated, scheduled under global and per-host limits,
+# and results are streamed out as each target finishes
+import asyncio
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+import zlib
+from collections import defaultdict, deque
+
+from core.checks import CHECKS, AddressResults, select_checks
+from core.engine import ScanEngine
+from core.pipeline import scan_target_async
+from core.recon import target_key
+from core.resolver import default_resolver
+from core.results import ScanRecord
+from core.store import ResultStore
+
+
+def load_targets(source):
+    """
+    Read targets from a file path (one per line, '#' comments allowed)
+    or pass through any iterable of URLs/domains.
+    """
+    if isinstance(source, str):
+        with open(source, encoding='utf-8') as fh:
+            lines = [line.strip() for line in fh]
+    else:
+        lines = [str(t).strip() for t in source]
+    return [line for line in lines if line and not line.startswith('#')]
+
+
+def dedupe_targets(targets):
+    """Keep the first target for each host, preserving input order"""
+    seen = set()
+    unique = []
+    for target in targets:
+        key = target_key(target)
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(target)
+    return unique
+
+
+class HostLimiter:
+    """Concurrency cap plus minimum spacing between scans of one host/IP"""
+
+    def __init__(self, concurrency, min_interval):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.min_interval = min_interval
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait_turn(self):
+        if not self.min_interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_start - now
+            self._next_start = max(now, self._next_start) + self.min_interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class BatchScheduler:
+    """
+    Scan many targets with bounded work.
+
+    - concurrency: targets scanned at once across the whole batch
+    - per_host:    targets scanned at once against one resolved address
+    - rate:        max target scans started per second against one address
+    - dedupe:      skip targets that point at a host already queued
+    - skip:        host keys to leave out (e.g. already in a resumed output file)
+    - store:       ResultStore to save results in; incremental=True reuses fresh ones
+    - checks:      subset of check names to run (default: full scan)
+    - wordlist:    admin path wordlist file used instead of the built-in paths
+    - share:       run address-scoped checks (ports) once per resolved IP and
+                   give every target on that IP the result
+    - progress:    callback(done, total, record) after every target
+    """
+
+    def __init__(self, concurrency=20, per_host=2, rate=None, dedupe=True,
+                 skip=None, progress=None, probe_concurrency=50, resolver=None,
+                 store=None, incremental=False, max_age=None, checks=None,
+                 wordlist=None, share=True, scan=scan_target_async):
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.min_interval = 1.0 / rate if rate else 0.0
+        self.dedupe = dedupe
+        self.skip = set(skip or ())
+        self.progress = progress
+        self.probe_concurrency = probe_concurrency
+        self.resolver = resolver or default_resolver
+        self.store = store
+        self.incremental = incremental
+        self.max_age = max_age
+        self.checks = select_checks(checks)
+        self.wordlist = wordlist
+        self.share = share
+        self.scan = scan
+
+    async def run_async(self, targets):
+        """
+        Async generator yielding one ScanRecord per target as it completes
+        (only `error` set if the scan itself failed)
+        """
+        targets = load_targets(targets)
+        if self.dedupe:
+            targets = dedupe_targets(targets)
+        if self.skip:
+            targets = [t for t in targets if target_key(t) not in self.skip]
+        total = len(targets)
+
+        limiters = {}
+        parked = defaultdict(deque)
+        # Bounded, so a slow consumer holds the workers back
+        results = asyncio.Queue(self.concurrency)
+        engine = ScanEngine(self.probe_concurrency)
+        shared = None
+        if self.share and any(CHECKS[name].scope == 'address' for name in self.checks):
+            shared = AddressResults()
+
+        # Warm the DNS cache for the whole batch in parallel; the scans
+        # themselves then resolve from cache
+        answers = await self.resolver.resolve_many_async(target_key(t) for t in targets)
+
+        def host_address(target):
+            answer = answers[target_key(target)]
+            addresses = answer['ipv4'] + answer['ipv6']
+            return addresses[0] if addresses else answer['host']
+
+        async def scan_host(address, limiter, target):
+            # Holds one of the address's slots until no target is parked behind it
+            async with limiter.semaphore:
+                while target is not None:
+                    await limiter.wait_turn()
+                    try:
+                        result = await self.scan(target, engine=engine, resolver=self.resolver,
+                                                 store=self.store, incremental=self.incremental,
+                                                 max_age=self.max_age, checks=self.checks,
+                                                 wordlist=self.wordlist, shared=shared)
+                    except Exception as e:
+                        result = ScanRecord(target, error=str(e))
+                    await results.put(result)
+                    target = parked[address].popleft() if parked[address] else None
+
+        pending = iter(targets)
+
+        async def worker():
+            # Workers pull from one lazy iterator instead of a task per target.
+            # A target whose address is at its per_host limit is parked for
+            # that address's scans to pick up, so the worker moves on
+            for target in pending:
+                address = host_address(target)
+                limiter = limiters.get(address)
+                if limiter is None:
+                    limiter = limiters[address] = HostLimiter(self.per_host, self.min_interval)
+                if limiter.semaphore.locked():
+                    parked[address].append(target)
+                    continue
+                await scan_host(address, limiter, target)
+
+        tasks = [asyncio.ensure_future(worker()) for _ in range(min(self.concurrency, total))]
+        try:
+            for done in range(1, total + 1):
+                result = await results.get()
+                if self.progress:
+                    self.progress(done, total, result)
+                yield result
+        finally:
+            for task in tasks:
+                task.cancel()
+            engine.close()
+
+    def run(self, targets):
+        """
+        Blocking generator over run_async(). The event loop runs in a
+        background thread; results are handed over as they finish.
+        """
+        handoff = queue.Queue()
+        done = object()
+        stop = threading.Event()
+        running = {}
+
+        async def pump():
+            running['loop'] = asyncio.get_running_loop()
+            running['task'] = asyncio.current_task()
+            if stop.is_set():
+                return
+            async for result in self.run_async(targets):
+                handoff.put(result)
+
+        def runner():
+            try:
+                asyncio.run(pump())
+            except BaseException as e:
+                handoff.put(e)
+            finally:
+                handoff.put(done)
+
+        thread = threading.Thread(target=runner, name='moriarty-batch', daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = handoff.get()
+                if item is done:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            # The consumer stopped early: cancel the scans still in flight
+            # rather than letting them run on until the next result
+            stop.set()
+            if 'task' in running:
+                try:
+                    running['loop'].call_soon_threadsafe(running['task'].cancel)
+                except RuntimeError:
+                    pass  # loop already finished
+
+
+class ShardedBatch:
+    """
+    BatchScheduler spread over worker processes, for runs too big for one core.
+
+    Targets are sharded by resolved address, so per-host limits and rates
+    still hold for the whole run. Each process runs its own event loop and
+    probe engine. postprocess(record) runs inside the workers, so CPU-heavy
+    work like report generation scales with cores; it must be a picklable,
+    module-level function returning the record. Records are yielded in
+    input order.
+
+    Other options are BatchScheduler's. concurrency and probe_concurrency
+    are split between the processes, and `store` is a ResultStore path.
+    """
+
+    def __init__(self, processes=None, postprocess=None, progress=None, dedupe=True,
+                 skip=None, resolver=None, store=None, **options):
+        self.processes = max(1, processes or os.cpu_count() or 1)
+        self.postprocess = postprocess
+        self.progress = progress
+        self.dedupe = dedupe
+        self.skip = set(skip or ())
+        self.resolver = resolver or default_resolver
+        self.options = dict(options, store=store)
+        for name in ('concurrency', 'probe_concurrency'):
+            if name in options:
+                self.options[name] = max(1, options[name] // self.processes)
+        # Fail in the parent rather than in every worker
+        self.options['checks'] = select_checks(options.get('checks'))
+
+    def shard(self, targets):
+        """Split targets into [(index, target), ...] per process, plus DNS answers"""
+        answers = self.resolver.resolve_many(target_key(t) for t in targets)
+        shards = [[] for _ in range(self.processes)]
+        for index, target in enumerate(targets):
+            answer = answers[target_key(target)]
+            address = (answer['ipv4'] + answer['ipv6'] or [answer['host']])[0]
+            shards[zlib.crc32(address.encode()) % self.processes].append((index, target))
+        return shards, answers
+
+    def run(self, targets):
+        """Blocking generator of results in input order"""
+        targets = load_targets(targets)
+        if self.dedupe:
+            targets = dedupe_targets(targets)
+        if self.skip:
+            targets = [t for t in targets if target_key(t) not in self.skip]
+        total = len(targets)
+        shards, answers = self.shard(targets)
+
+        # spawn: the parent may already run threads, which fork does not copy safely
+        ctx = multiprocessing.get_context('spawn')
+        out = ctx.Queue()
+        workers = []
+        for shard in shards:
+            if not shard:
+                continue
+            shard_answers = {target_key(t): answers[target_key(t)] for _, t in shard}
+            process = ctx.Process(target=_run_shard, name='moriarty-shard', daemon=True,
+                                  args=(shard, shard_answers, self.options, self.postprocess, out))
+            process.start()
+            workers.append(process)
+
+        buffered = {}
+        next_index = done = finished = 0
+        try:
+            while finished < len(workers):
+                try:
+                    index, result = out.get(timeout=1)
+                except queue.Empty:
+                    if not any(w.is_alive() for w in workers):
+                        break
+                    continue
+                if index is None:
+                    finished += 1
+                    continue
+                buffered[index] = result
+                done += 1
+                if self.progress:
+                    self.progress(done, total, result)
+                while next_index in buffered:
+                    yield buffered.pop(next_index)
+                    next_index += 1
+
+            # Anything still missing belonged to a worker that died
+            for index in range(next_index, total):
+                yield buffered.pop(index, None) or ScanRecord(targets[index],
+                                                              error='worker process exited')
+        finally:
+            for process in workers:
+                if process.is_alive():
+                    process.terminate()
+                process.join()
+
+
+def _run_shard(items, answers, options, postprocess, out):
+    """Worker process body: scan one shard and send back (index, result) pairs"""
+    # Ctrl-C goes to the whole process group; the parent stops the workers itself
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    options = dict(options)
+    store = ResultStore(options['store']) if options.get('store') else None
+    options['store'] = store
+    default_resolver.prime(answers)
+    indices = defaultdict(deque)
+    for index, target in items:
+        indices[target].append(index)
+
+    async def drain():
+        scheduler = BatchScheduler(dedupe=False, **options)
+        async for result in scheduler.run_async([t for _, t in items]):
+            if postprocess:
+                try:
+                    result = postprocess(result)
+                except Exception as e:
+                    result.postprocess_error = str(e)
+            out.put((indices[result.target].popleft(), result))
+
+    try:
+        asyncio.run(drain())
+    finally:
+        if store:
+            store.close()
+        out.put((None, None))
+
+
+def scan_batch(targets, **options):
+    """Convenience wrapper: iterate BatchScheduler(**options).run(targets)"""
+    return BatchScheduler(**options).run(targets)
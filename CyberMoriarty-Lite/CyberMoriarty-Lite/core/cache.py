@@ -0,0 +1,99 @@
+# Per-scan response cache
+# Fetch a URL once per scan; recon and the analysis checks read the snapshot
+import threading
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_url(url):
+    """Canonical form of a URL for cache lookups (case, default port, empty path)"""
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f'{host}:{parts.port}'
+    path = parts.path or '/'
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, path, query, ''))
+
+
+def cache_key(method, url, params=None, allow_redirects=True):
+    params = tuple(sorted((params or {}).items()))
+    return (method.upper(), normalize_url(url), params, bool(allow_redirects))
+
+
+class CachedResponse:
+    """Snapshot of a response: status, headers, final URL and optionally the body"""
+
+    def __init__(self, url, status_code, headers, content=None, encoding=None, redirects=0):
+        self.url = url
+        self.redirects = redirects
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+        self.encoding = encoding or 'utf-8'
+
+    @classmethod
+    def from_response(cls, r, keep_body=False):
+        return cls(
+            url=r.url,
+            status_code=r.status_code,
+            headers=r.headers,
+            content=r.content if keep_body else None,
+            encoding=r.encoding if keep_body else None,
+            redirects=len(r.history),
+        )
+
+    @property
+    def has_body(self):
+        return self.content is not None
+
+    @property
+    def text(self):
+        if self.content is None:
+            return ''
+        return self.content.decode(self.encoding, errors='replace')
+
+
+class ResponseCache:
+    """
+    Thread-safe map of request key -> CachedResponse (or the error it raised).
+    Failures are cached too so a dead host is only timed out once per scan.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def key_lock(self, key):
+        """Per-key lock so concurrent checks asking for the same URL wait for one fetch"""
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def get(self, key, need_body=False):
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if need_body and isinstance(entry, CachedResponse) and not entry.has_body:
+            return None
+        return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._key_locks.clear()
+
+    def __len__(self):
+        return len(self._entries)
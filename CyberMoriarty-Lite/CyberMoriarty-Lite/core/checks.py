@@ -0,0 +1,311 @@
+# Check registry and planner
+# Every check declares what it needs and roughly what it costs; the planner
+# pulls in dependencies, and each check starts as soon as its inputs are ready
+import asyncio
+import time
+
+import requests
+
+from core.recon import SchemeProbe, get_hostname_from_input, recon_async
+from core.results import AdminResult, HeadersResult, PortsResult, ReconResult, XssResult
+from core.scanner import (
+    COMMON_ADMIN_PATHS,
+    COMMON_PORTS,
+    XSS_TEST_PARAMS,
+    check_security_headers_async,
+    find_admin_pages_async,
+    port_scan_common_async,
+    quick_xss_reflection_test_async,
+)
+
+
+class Check:
+    """
+    A registered scan step.
+
+    - requires: names of checks whose results must exist first
+    - cost:     rough number of network operations, used to start big checks early
+    - field:    key of the result in a scan record (None for internal helpers)
+    - result:   Result subclass the check returns (selectable checks only)
+    - default:  part of a full scan when the caller selects nothing
+    - scope:    'host' (per virtual host) or 'address': the outcome depends
+                only on the resolved IP, so targets sharing an address can
+                share one run (see AddressResults). Address checks require 'dns'.
+    """
+
+    def __init__(self, name, run, requires=(), cost=1, field=None, default=True, description='',
+                 result=None, scope='host'):
+        if scope not in ('host', 'address'):
+            raise ValueError(f'Unknown check scope {scope!r}')
+        if scope == 'address' and 'dns' not in requires:
+            raise ValueError(f'Address-scoped check {name!r} must require dns')
+        self.name = name
+        self.run = run
+        self.requires = tuple(requires)
+        self.cost = cost
+        self.field = field
+        self.result = result
+        self.default = default
+        self.description = description
+        self.scope = scope
+
+    def __repr__(self):
+        return f'<Check {self.name} requires={list(self.requires)} cost={self.cost}>'
+
+
+# name -> Check, in registration order
+CHECKS = {}
+
+
+def register_check(name, requires=(), cost=1, field=None, default=True, description='',
+                   result=None, scope='host'):
+    """Decorator registering `async def check(ctx)` under `name`"""
+    def decorator(fn):
+        CHECKS[name] = Check(name, fn, requires, cost, field, default,
+                             description or (fn.__doc__ or '').strip(), result, scope)
+        return fn
+    return decorator
+
+
+def default_checks():
+    """Names of the checks a full scan runs"""
+    return [c.name for c in CHECKS.values() if c.default and c.field]
+
+
+def available_checks():
+    """Names a caller may select"""
+    return [c.name for c in CHECKS.values() if c.field]
+
+
+def result_types(names=None):
+    """{name: Result subclass} for the selected checks (default set if None)"""
+    return {name: CHECKS[name].result for name in select_checks(names)}
+
+
+def select_checks(names=None):
+    """Validate a caller's selection; None or empty means the default set"""
+    if not names:
+        return default_checks()
+    if isinstance(names, str):
+        names = [n for n in names.replace(',', ' ').split() if n]
+    unknown = [n for n in names if n not in CHECKS or not CHECKS[n].field]
+    if unknown:
+        raise ValueError(f"Unknown check(s): {', '.join(unknown)}. "
+                         f"Available: {', '.join(available_checks())}")
+    return list(dict.fromkeys(names))
+
+
+def plan(selected=None, done=()):
+    """
+    Checks needed to produce `selected`, dependencies first.
+    Names in `done` already have results and are left out.
+    """
+    selected = select_checks(selected)
+    done = set(done)
+    order, visiting = [], set()
+
+    def visit(name):
+        if name in done or name in order:
+            return
+        if name in visiting:
+            raise ValueError(f'Dependency cycle at check {name!r}')
+        visiting.add(name)
+        for dep in CHECKS[name].requires:
+            visit(dep)
+        visiting.discard(name)
+        order.append(name)
+
+    for name in selected:
+        visit(name)
+    return order
+
+
+def plan_stages(selected=None, done=()):
+    """The plan grouped into stages whose checks can all run in parallel"""
+    order = plan(selected, done)
+    stage_of = {}
+    for name in order:
+        deps = [stage_of[d] for d in CHECKS[name].requires if d in stage_of]
+        stage_of[name] = max(deps, default=-1) + 1
+    stages = [[] for _ in range(max(stage_of.values(), default=-1) + 1)]
+    for name in order:
+        stages[stage_of[name]].append(name)
+    return stages
+
+
+class CheckContext:
+    """
+    What a check gets to work with: target, shared session/engine/resolver
+    and earlier results. `shared` is the batch's AddressResults, if any;
+    `shared_checks` lists the checks answered from it.
+    """
+
+    def __init__(self, url, session, engine, resolver, metrics=None, wordlist=None, shared=None):
+        self.url = url
+        self.session = session
+        self.engine = engine
+        self.resolver = resolver
+        self.metrics = metrics
+        self.wordlist = wordlist
+        self.shared = shared
+        self.shared_checks = []
+        self.results = {}
+
+
+class AddressResults:
+    """
+    Results of address-scoped checks for one batch, keyed by (check, IP).
+    The first target on an address runs the check; every other target on
+    it (e.g. virtual hosts behind one load balancer) awaits that run and
+    gets its own copy of the result.
+    """
+
+    def __init__(self):
+        self._runs = {}
+        self.hits = 0
+
+    async def get(self, name, address, run):
+        """(result, shared): `run()` is only awaited if nobody ran it for `address` yet"""
+        key = (name, address)
+        task = self._runs.get(key)
+        if task is None:
+            # A task of its own, so one target being cancelled does not cancel the others
+            task = self._runs[key] = asyncio.ensure_future(run())
+            return await asyncio.shield(task), False
+        self.hits += 1
+        result = await asyncio.shield(task)
+        return type(result).from_row(result.to_row()), True
+
+    def __len__(self):
+        return len(self._runs)
+
+
+def first_address(answer):
+    """First resolved address of a DNS answer (IPv4 preferred), or None"""
+    if not answer:
+        return None
+    addresses = answer.get('ipv4', []) + answer.get('ipv6', [])
+    return addresses[0] if addresses else None
+
+
+async def run_checks(ctx, selected=None, done=None, on_check=None, timings=None):
+    """
+    Run the plan for `selected` on `ctx`. Each check waits only for its
+    own dependencies, so independent checks overlap. Returns {name: result}
+    for every check in the plan plus any `done` results passed in.
+    on_check(name, result, seconds) fires for selectable checks.
+    Every check is also recorded as a span in ctx.metrics, if set.
+    """
+    done = dict(done or {})
+    ctx.results.update(done)
+    timings = {} if timings is None else timings
+    order = plan(selected, done)
+    tasks = {}
+
+    async def run_one(check):
+        deps = [tasks[d] for d in check.requires if d in tasks]
+        if deps:
+            await asyncio.gather(*deps)
+        start = time.perf_counter()
+        ok = False
+        try:
+            result = await _run_check(check, ctx)
+            ok = True
+        finally:
+            seconds = time.perf_counter() - start
+            timings[check.name] = round(seconds, 4)
+            if ctx.metrics is not None:
+                ctx.metrics.record_span(check.name, seconds, ok)
+        ctx.results[check.name] = result
+        if on_check and check.field:
+            on_check(check.name, result, timings[check.name])
+        return result
+
+    # Expensive checks are created first so they grab probe slots early
+    for name in sorted(order, key=lambda n: -CHECKS[n].cost):
+        tasks[name] = asyncio.ensure_future(run_one(CHECKS[name]))
+    try:
+        await asyncio.gather(*tasks.values())
+    finally:
+        for task in tasks.values():
+            task.cancel()
+    return {name: ctx.results[name] for name in list(done) + order}
+
+
+async def _run_check(check, ctx):
+    address = None
+    if check.scope == 'address' and ctx.shared is not None:
+        address = first_address(ctx.results.get('dns'))
+    if address is None:
+        return await check.run(ctx)
+    result, shared = await ctx.shared.get(check.name, address, lambda: check.run(ctx))
+    if shared:
+        ctx.shared_checks.append(check.name)
+    return result
+
+
+def root_url(url):
+    """URL of the target's root page as the checks request it"""
+    return url if url.startswith('http') else 'http://' + url
+
+
+# Built-in checks
+
+@register_check('dns', cost=1, default=False, description='Resolve A/AAAA records')
+async def _dns_check(ctx):
+    return await ctx.resolver.resolve_async(get_hostname_from_input(ctx.url))
+
+
+@register_check('root', cost=2, default=False,
+                description='Fetch the root page once (HTTP and HTTPS raced) for later checks')
+async def _root_check(ctx):
+    if ctx.url.startswith('http'):
+        # An explicit scheme is the caller's choice; do not race the other one
+        try:
+            r = await ctx.engine.run(ctx.session.fetch, ctx.url, allow_redirects=True)
+        except requests.exceptions.RequestException as e:
+            return {'error': str(e)}
+        return {'status_code': r.status_code, 'final_url': r.url, 'url': ctx.url}
+
+    # Recon waits for the losing scheme later; later checks only need the winner
+    probe = SchemeProbe(ctx.session, ctx.engine, get_hostname_from_input(ctx.url))
+    r = await probe.first()
+    if r is None:
+        return {'error': str(probe.outcomes.get('http')), 'probe': probe}
+    return {'status_code': r.status_code, 'final_url': r.url, 'url': probe.url, 'probe': probe}
+
+
+@register_check('recon', requires=('dns', 'root'), cost=2, field='recon', result=ReconResult,
+                description='IP, HTTPS usage and server fingerprint')
+async def _recon_check(ctx):
+    return await recon_async(ctx.url, session=ctx.session, engine=ctx.engine, resolver=ctx.resolver,
+                             probe=ctx.results['root'].get('probe'))
+
+
+@register_check('headers', requires=('root',), cost=1, field='missing_headers',
+                result=HeadersResult, description='Missing security headers')
+async def _headers_check(ctx):
+    # Same page (and cache entry) as the root check, on whichever scheme answered
+    url = ctx.results['root'].get('url') or ctx.url
+    return await check_security_headers_async(url, session=ctx.session, engine=ctx.engine)
+
+
+@register_check('admin', cost=len(COMMON_ADMIN_PATHS), field='admin_pages', result=AdminResult,
+                description='Exposed admin/login pages')
+async def _admin_check(ctx):
+    return await find_admin_pages_async(ctx.url, session=ctx.session, engine=ctx.engine,
+                                        wordlist=ctx.wordlist)
+
+
+@register_check('xss', cost=len(XSS_TEST_PARAMS), field='xss_possible', result=XssResult,
+                description='Basic reflected XSS probe')
+async def _xss_check(ctx):
+    return await quick_xss_reflection_test_async(ctx.url, session=ctx.session, engine=ctx.engine)
+
+
+@register_check('ports', requires=('dns',), cost=len(COMMON_PORTS), field='open_ports',
+                result=PortsResult, default=False, scope='address',
+                description='Open common TCP ports')
+async def _ports_check(ctx):
+    return await port_scan_common_async(ctx.url, engine=ctx.engine, resolver=ctx.resolver,
+                                        metrics=ctx.metrics)
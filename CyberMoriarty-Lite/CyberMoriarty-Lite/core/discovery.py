@@ -0,0 +1,302 @@
+# Wordlist-driven path discovery
+# Streams a wordlist through a fixed pool of workers, recognises soft-404
+# (catch-all) hosts once, and skips paths under directories that are absent.
+# Paths are probed with HEAD (or a GET closed after the headers), so no page
+# body is downloaded unless it has to be compared with a soft-404 page
+import asyncio
+import re
+import uuid
+from urllib.parse import urljoin, urlsplit
+
+import requests
+
+# Statuses that count as "the path exists"
+FOUND_STATUSES = (200,)
+
+# Redirects; what they point at decides whether the path counts (see _redirect_kind)
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+# HEAD answers meaning "ask again with GET"
+HEAD_UNSUPPORTED = (405, 501)
+
+# A redirect whose target host or path matches this leads to a login page
+LOGIN_HINTS = re.compile(r'log-?in|log-?on|sign-?in|auth|sso|session|account', re.IGNORECASE)
+
+# Statuses that prove a directory is absent, so nothing under it is probed
+ABSENT_STATUSES = (404, 410)
+
+# Bytes read from a response that has to be compared with the soft-404 page
+SOFT404_MAX_BYTES = 256 * 1024
+
+# Allowed length difference from the soft-404 page (after removing the echoed path)
+SOFT404_TOLERANCE = 32
+
+
+def iter_wordlist(source):
+    """
+    Paths from a wordlist file (read lazily, '#' comments allowed) or from
+    an iterable, each with a leading '/'. Repeated paths are dropped.
+    """
+    def lines():
+        if isinstance(source, str):
+            with open(source, encoding='utf-8', errors='replace') as fh:
+                yield from fh
+        else:
+            yield from source
+
+    seen = set()
+    for line in lines():
+        path = str(line).strip()
+        if not path or path.startswith('#'):
+            continue
+        if not path.startswith('/'):
+            path = '/' + path
+        if path not in seen:
+            seen.add(path)
+            yield path
+
+
+def parent_dirs(path):
+    """'/a/b/c' -> ['/a', '/a/b'], shallowest first"""
+    parts = [p for p in path.strip('/').split('/') if p]
+    return ['/' + '/'.join(parts[:i]) for i in range(1, len(parts))]
+
+
+def _location_template(location, path):
+    """Location with the probed path taken out, so catch-all redirects for different paths match"""
+    return (location or '').replace(path.lstrip('/'), '{path}')
+
+
+def _redirect_kind(url, target):
+    """
+    'canonical' when `target` is the same path (trailing slash added or
+    removed, or HTTP upgraded to HTTPS), 'login' when it leads to a login
+    page, else 'other' (e.g. everything unknown sent to the home page)
+    """
+    source, dest = urlsplit(url), urlsplit(target)
+    if dest.hostname == source.hostname and dest.path.rstrip('/') == source.path.rstrip('/'):
+        return 'canonical'
+    if LOGIN_HINTS.search(dest.netloc + dest.path):
+        return 'login'
+    return 'other'
+
+
+def _page_info(r):
+    """Status, Content-Length and Location of a response, as far as they are known"""
+    info = {'status': r.status_code}
+    length = r.headers.get('Content-Length')
+    if length and length.isdigit():
+        info['length'] = int(length)
+    if r.headers.get('Location'):
+        info['location'] = r.headers['Location']
+    return info
+
+
+def _fingerprint(r, path, max_bytes=SOFT404_MAX_BYTES):
+    """
+    (status, Location template, body length) of a response with every echo
+    of `path` taken out, so two catch-all pages for different paths match.
+    The body is streamed and counted, never kept.
+    """
+    marker = path.lstrip('/').encode('utf-8')
+    location = _location_template(r.headers.get('Location'), path)
+    length = occurrences = 0
+    tail = b''
+    for chunk in r.iter_content(16 * 1024):
+        window = tail + chunk
+        if marker:
+            occurrences += window.count(marker) - tail.count(marker)
+        length += len(chunk)
+        if length >= max_bytes:
+            break
+        tail = window[-(len(marker) - 1):] if len(marker) > 1 else b''
+    return r.status_code, location, length - occurrences * len(marker)
+
+
+def _matches(fingerprint, other):
+    return (fingerprint[0] == other[0] and fingerprint[1] == other[1]
+            and abs(fingerprint[2] - other[2]) <= SOFT404_TOLERANCE)
+
+
+async def discover_paths_async(base_url, wordlist, http, eng, timeout=3, prune=True,
+                               workers=None):
+    """
+    Probe every path of `wordlist` under `base_url` (see iter_wordlist).
+
+    - paths are requested with HEAD; if the host rejects HEAD (405/501) a
+      GET is sent instead and its connection closed once the headers are in
+    - a 200 is a hit; a redirect is followed one hop if it only adds a slash
+      or switches to HTTPS, counts as login-gated if it leads to a login
+      page, and is otherwise ignored (counted in 'redirects')
+    - a random path is requested first; if the host answers it like a real
+      page, responses that look the same (soft 404s) are not reported
+    - with prune=True, each parent path is probed once and everything
+      below a parent answering 404/410 is skipped
+    - at most `workers` probes (default: the engine's limit) are in flight
+
+    Returns {'found', 'login_gated', 'pages', 'catch_all', 'probed',
+    'pruned', 'soft_404', 'redirects'}: 'found' and 'login_gated' keep
+    wordlist order, 'pages' maps each of their paths to its status,
+    Content-Length and Location. If no request got an answer at all, 'error'
+    holds the first failure, so "nothing found" is never reported for a
+    host that could not be reached.
+    """
+    base = base_url if base_url.endswith('/') else base_url + '/'
+    stats = {'probed': 0, 'pruned': 0, 'soft_404': 0, 'redirects': 0}
+    # None until the host's first answer to HEAD says whether it supports it
+    head = {'supported': None}
+    answers = {'count': 0, 'error': None}
+
+    def request(method, url, **kwargs):
+        try:
+            r = http.request(method, url, timeout=timeout, allow_redirects=False, **kwargs)
+        except requests.exceptions.RequestException as e:
+            answers['error'] = answers['error'] or str(e)
+            raise
+        answers['count'] += 1
+        return r
+
+    def send(url):
+        """Headers-only response for `url` (the caller releases it)"""
+        if head['supported'] is not False:
+            r = request('HEAD', url)
+            if r.status_code not in HEAD_UNSUPPORTED:
+                head['supported'] = True
+                return r
+            http.release(r)
+            # A route can refuse HEAD alone; only a first refusal turns it off for the host
+            if head['supported'] is None:
+                head['supported'] = False
+        return request('GET', url, stream=True)
+
+    def get(url):
+        return request('GET', url, stream=True)
+
+    def probe_random():
+        path = f'/moriarty-{uuid.uuid4().hex[:12]}'
+        url = urljoin(base, path.lstrip('/'))
+        try:
+            r = send(url)
+            http.release(r, drain=False)
+            if r.status_code in REDIRECT_STATUSES:
+                return r.status_code, _location_template(r.headers.get('Location'), path), 0
+            if r.status_code not in FOUND_STATUSES:
+                return None
+            r = get(url)
+            try:
+                return _fingerprint(r, path)
+            finally:
+                http.release(r, drain=False)
+        except requests.exceptions.RequestException:
+            return None
+
+    def look(url, path):
+        """(status, Location, page info, soft-404 fingerprint or None) of one request"""
+        # On a catch-all host every path answers with a page whose body has
+        # to be compared anyway, so HEAD would only add a round trip
+        r = get(url) if pages_everywhere else send(url)
+        try:
+            fingerprint = None
+            if pages_everywhere and r.status_code in FOUND_STATUSES:
+                fingerprint = _fingerprint(r, path)
+            return r.status_code, r.headers.get('Location'), _page_info(r), fingerprint
+        finally:
+            http.release(r, drain=False)
+
+    def classify(url, path, follow=True, seen=None):
+        """
+        (outcome, page info); outcome is 'found', 'login', 'redirect',
+        'soft_404' or None. `seen` is an earlier look() at `url`.
+        """
+        status, location, info, fingerprint = seen or look(url, path)
+        if status in FOUND_STATUSES:
+            if fingerprint is not None and _matches(soft_404, fingerprint):
+                return 'soft_404', info
+            return 'found', info
+        if status not in REDIRECT_STATUSES or not location:
+            return None, info
+        if soft_404 is not None and soft_404[:2] == (status, _location_template(location, path)):
+            return 'soft_404', info
+        target = urljoin(url, location)
+        kind = _redirect_kind(url, target)
+        if kind == 'canonical' and follow:
+            outcome, _ = classify(target, urlsplit(target).path, follow=False)
+            return outcome, info
+        return ('login' if kind == 'login' else 'redirect'), info
+
+    def url_of(path):
+        # '/admin' rather than '/admin/': routed apps often 404 the slash form
+        return urljoin(base, path.lstrip('/'))
+
+    def probe(path, seen=None):
+        try:
+            return classify(url_of(path), path, seen=seen)
+        except requests.exceptions.RequestException:
+            return None, None
+
+    def safe_look(path):
+        try:
+            return look(url_of(path), path)
+        except requests.exceptions.RequestException:
+            return None
+
+    # With pruning, every path is looked at once and the answer is shared by
+    # the directory check and the path's own classification, so '/admin'
+    # next to '/admin/login' is requested only once
+    looks = {}
+
+    async def looked(path):
+        task = looks.get(path)
+        if task is None:
+            stats['probed'] += 1
+            task = looks[path] = asyncio.ensure_future(eng.run(safe_look, path))
+        return await task
+
+    async def dir_present(directory):
+        seen = await looked(directory)
+        # Unknown is not absent
+        return seen is None or seen[0] not in ABSENT_STATUSES
+
+    found, gated, pages = [], [], {}
+    paths = enumerate(iter_wordlist(wordlist))
+
+    async def worker():
+        # Workers pull from one lazy iterator instead of a task per path
+        for index, path in paths:
+            if prune:
+                present = True
+                for directory in parent_dirs(path):
+                    present = await dir_present(directory)
+                    if not present:
+                        break
+                if not present:
+                    stats['pruned'] += 1
+                    continue
+            if prune:
+                seen = await looked(path)
+                outcome, info = await eng.run(probe, path, seen) if seen else (None, None)
+            else:
+                stats['probed'] += 1
+                outcome, info = await eng.run(probe, path)
+            if outcome in ('found', 'login'):
+                (found if outcome == 'found' else gated).append((index, path))
+                pages[index] = (path, info)
+            elif outcome == 'soft_404':
+                stats['soft_404'] += 1
+            elif outcome == 'redirect':
+                stats['redirects'] += 1
+
+    stats['probed'] += 1
+    soft_404 = await eng.run(probe_random)
+    pages_everywhere = soft_404 is not None and soft_404[0] in FOUND_STATUSES
+    await asyncio.gather(*(worker() for _ in range(workers or eng.concurrency)))
+    result = {
+        'found': [path for _, path in sorted(found)],
+        'login_gated': [path for _, path in sorted(gated)],
+        'pages': dict(pages[index] for index in sorted(pages)),
+        'catch_all': soft_404 is not None,
+        **stats,
+    }
+    if not answers['count'] and answers['error']:
+        result['error'] = answers['error']
+    return result
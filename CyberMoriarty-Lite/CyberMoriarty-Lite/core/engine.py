@@ -0,0 +1,176 @@
+# Asyncio scan engine
+# Runs the probes inside each check concurrently under one bounded semaphore
+import asyncio
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from functools import partial
+
+DEFAULT_CONCURRENCY = 20
+
+
+class ScanEngine:
+    """
+    Concurrency limiter shared by the async checks.
+
+    Blocking work (requests, gethostbyname) runs in a private thread pool;
+    native asyncio work (socket connects) runs on the loop. Both count
+    against the same limit, so a scan never has more than `concurrency`
+    probes in flight.
+    """
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY):
+        self.concurrency = concurrency
+        self._executor = ThreadPoolExecutor(max_workers=concurrency,
+                                            thread_name_prefix='moriarty-probe')
+        # asyncio primitives belong to one loop; keep a semaphore per loop
+        # (plus a lock serializing multi-slot reservations)
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    def _semaphore(self):
+        return self._primitives()[0]
+
+    def _primitives(self):
+        loop = asyncio.get_running_loop()
+        primitives = self._semaphores.get(loop)
+        if primitives is None:
+            primitives = self._semaphores[loop] = (asyncio.Semaphore(self.concurrency),
+                                                   asyncio.Lock())
+        return primitives
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one concurrency slot for native async work"""
+        async with self._semaphore():
+            yield
+
+    async def run(self, fn, *args, **kwargs):
+        """Run a blocking probe in the pool under the concurrency limit"""
+        async with self._semaphore():
+            return await self._offload(fn, *args, **kwargs)
+
+    @asynccontextmanager
+    async def reserve(self, slots):
+        """
+        Hold up to `slots` concurrency slots at once, for work that keeps
+        that many probes in flight by itself (e.g. a PortScanner loop).
+        Yields the number held; run the work with run_reserved() inside.
+        """
+        slots = max(1, min(slots, self.concurrency))
+        sem, lock = self._primitives()
+        # One reservation fills up at a time, so two never wait on each other's half
+        async with lock:
+            for _ in range(slots):
+                await sem.acquire()
+        try:
+            yield slots
+        finally:
+            for _ in range(slots):
+                sem.release()
+
+    async def run_reserved(self, fn, *args, **kwargs):
+        """run() for work already covered by reserve(): takes no further slot"""
+        return await self._offload(fn, *args, **kwargs)
+
+    async def _offload(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(fn, *args, **kwargs))
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+@contextmanager
+def engine_scope(engine=None, **options):
+    """Yield the caller's engine, or a temporary one that is closed afterwards"""
+    if engine is not None:
+        yield engine
+        return
+
+    engine = ScanEngine(**options)
+    try:
+        yield engine
+    finally:
+        engine.close()
+
+
+def run_sync(coro):
+    """
+    Run a coroutine to completion from synchronous code.
+    The blocking check functions are thin wrappers built on this.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    # Already inside an event loop (e.g. called from async code): use a helper thread
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
+
+
+class BackgroundRun:
+    """
+    Run a coroutine on its own event loop in a daemon thread, so a UI
+    thread can start a scan and stop it again without blocking.
+
+    cancel() may be called from any thread, even before the loop has
+    started; the coroutine then sees CancelledError at its next await
+    (a probe already running in a worker thread still finishes, but
+    queued probes are dropped when the scan's engine closes).
+
+    on_done(result, error, cancelled) is called from the worker thread.
+    """
+
+    def __init__(self, coro, on_done=None, name='moriarty-scan'):
+        self.cancelled = False
+        self._lock = threading.Lock()
+        self._loop = None
+        self._task = None
+        self._thread = threading.Thread(target=self._main, args=(coro, on_done),
+                                        name=name, daemon=True)
+        self._thread.start()
+
+    @property
+    def running(self):
+        return self._thread.is_alive()
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            if self._task is not None:
+                try:
+                    self._loop.call_soon_threadsafe(self._task.cancel)
+                except RuntimeError:
+                    pass  # the loop already finished
+
+    def join(self, timeout=None):
+        self._thread.join(timeout)
+
+    def _main(self, coro, on_done):
+        async def guarded():
+            with self._lock:
+                if self.cancelled:
+                    coro.close()
+                    raise asyncio.CancelledError
+                self._loop = asyncio.get_running_loop()
+                self._task = asyncio.current_task()
+            return await coro
+
+        result = error = None
+        stopped = False
+        try:
+            result = asyncio.run(guarded())
+        except asyncio.CancelledError:
+            stopped = True
+        except Exception as e:
+            error = e
+        if on_done:
+            on_done(result, error, stopped)
@@ -0,0 +1,111 @@
+# Per-host latency estimator behind adaptive timeouts
+# The first answers of a scan set how long later probes may wait, and a
+# host that never answered is not probed again
+import threading
+from urllib.parse import urlsplit
+
+from core.cache import DEFAULT_PORTS
+
+
+def host_key(url):
+    """host:port a URL connects to (default port filled in)"""
+    parts = urlsplit(url)
+    port = parts.port or DEFAULT_PORTS.get(parts.scheme.lower(), 80)
+    return f'{(parts.hostname or "").lower()}:{port}'
+
+
+class _HostState:
+    def __init__(self):
+        self.srtt = None
+        self.rttvar = None
+        self.samples = 0
+        self.failures = 0
+        self.pilot = None
+
+
+class LatencyTracker:
+    """
+    Smoothed latency per host (SRTT/RTTVAR as in TCP's RFC 6298).
+
+    - timeout(key, default): max(multiplier * srtt, srtt + 4 * rttvar),
+      clamped to [floor, default]; `default` until a sample exists
+    - unreachable(key): `failures_to_skip` failures and not one answer
+    - admit(key): the first request to a host goes alone; concurrent ones
+      wait for its outcome so they start with a real estimate (or skip)
+    """
+
+    def __init__(self, multiplier=4.0, floor=1.0, failures_to_skip=1):
+        self.multiplier = multiplier
+        self.floor = floor
+        self.failures_to_skip = failures_to_skip
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _state(self, key):
+        state = self._hosts.get(key)
+        if state is None:
+            state = self._hosts[key] = _HostState()
+        return state
+
+    def observe(self, key, seconds):
+        """Record an answer that took `seconds`"""
+        with self._lock:
+            state = self._state(key)
+            if state.srtt is None:
+                state.srtt, state.rttvar = seconds, seconds / 2
+            else:
+                state.rttvar = 0.75 * state.rttvar + 0.25 * abs(state.srtt - seconds)
+                state.srtt = 0.875 * state.srtt + 0.125 * seconds
+            state.samples += 1
+            state.failures = 0
+
+    def failed(self, key):
+        """Record a probe that got no answer (refused, unroutable or timed out)"""
+        with self._lock:
+            self._state(key).failures += 1
+
+    def unreachable(self, key):
+        with self._lock:
+            state = self._hosts.get(key)
+            return (state is not None and state.samples == 0
+                    and state.failures >= self.failures_to_skip)
+
+    def timeout(self, key, default):
+        with self._lock:
+            state = self._hosts.get(key)
+            if state is None or state.srtt is None:
+                return default
+            estimate = max(self.multiplier * state.srtt, state.srtt + 4 * state.rttvar)
+        return min(default, max(self.floor, estimate))
+
+    def admit(self, key):
+        """
+        True if the caller is the host's first request (call release() when
+        it has an outcome); otherwise wait until that outcome exists.
+        """
+        with self._lock:
+            state = self._state(key)
+            if state.pilot is None:
+                state.pilot = threading.Event()
+                return True
+            pilot = state.pilot
+        pilot.wait()
+        return False
+
+    def release(self, key):
+        with self._lock:
+            pilot = self._state(key).pilot
+        pilot.set()
+
+    def estimate(self, key):
+        """{'srtt', 'rttvar', 'samples', 'failures'} for reporting"""
+        with self._lock:
+            state = self._hosts.get(key)
+            if state is None:
+                return None
+            return {
+                'srtt': round(state.srtt, 4) if state.srtt is not None else None,
+                'rttvar': round(state.rttvar, 4) if state.rttvar is not None else None,
+                'samples': state.samples,
+                'failures': state.failures,
+            }
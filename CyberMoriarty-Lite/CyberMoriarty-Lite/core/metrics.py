@@ -0,0 +1,173 @@
+# Scan instrumentation
+# Per-scan spans and counters, subscriber hooks, and a process-wide
+# registry that renders Prometheus text for the web /metrics endpoint
+import threading
+import time
+from collections import Counter, defaultdict
+
+# Upper bounds (seconds) of the check duration histogram buckets
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+class ScanMetrics:
+    """
+    Spans and counters for one scan.
+
+    Events are passed to every subscriber as fn(event, data):
+    - 'span'    {'name', 'seconds', 'ok'}               a check finished
+    - 'request' {'method', 'url', 'status', 'bytes', 'seconds', 'retries'}
+    - 'error'   {'method', 'url', 'kind', 'seconds'}     kind: 'timeout', 'error' or 'skipped'
+    - 'connect' {'address', 'port', 'state', 'seconds'}  open, closed, filtered or skipped
+    The process-wide registry is always subscribed.
+    """
+
+    def __init__(self, subscribers=(), registry=None):
+        self.spans = []
+        self.counters = Counter()
+        self._subscribers = list(subscribers)
+        self._registry = registry if registry is not None else default_registry
+        self._lock = threading.Lock()
+
+    def subscribe(self, fn):
+        self._subscribers.append(fn)
+        return fn
+
+    def emit(self, event, data):
+        self._registry.handle(event, data)
+        for fn in list(self._subscribers):
+            fn(event, data)
+
+    def record_span(self, name, seconds, ok=True):
+        data = {'name': name, 'seconds': round(seconds, 4), 'ok': ok}
+        with self._lock:
+            self.spans.append(data)
+        self.emit('span', data)
+
+    def record_request(self, method, url, status, nbytes, seconds, retries=0):
+        with self._lock:
+            self.counters['requests'] += 1
+            self.counters['bytes'] += nbytes
+            self.counters['retries'] += retries
+        self.emit('request', {'method': method, 'url': url, 'status': status,
+                              'bytes': nbytes, 'seconds': round(seconds, 4), 'retries': retries})
+
+    def record_error(self, method, url, kind, seconds):
+        with self._lock:
+            if kind == 'skipped':
+                # Never sent, so not a request
+                self.counters['skipped'] += 1
+            else:
+                self.counters['requests'] += 1
+                self.counters['timeouts' if kind == 'timeout' else 'errors'] += 1
+        self.emit('error', {'method': method, 'url': url, 'kind': kind,
+                            'seconds': round(seconds, 4)})
+
+    def record_connect(self, address, port, state, seconds):
+        with self._lock:
+            self.counters['connects'] += 1
+            if state == 'filtered':
+                self.counters['timeouts'] += 1
+            elif state == 'skipped':
+                self.counters['skipped'] += 1
+        self.emit('connect', {'address': address, 'port': port, 'state': state,
+                              'seconds': round(seconds, 4)})
+
+    def to_dict(self):
+        with self._lock:
+            counters = {key: self.counters.get(key, 0)
+                        for key in ('requests', 'bytes', 'retries', 'timeouts', 'errors',
+                                    'skipped', 'connects')}
+            return {'spans': list(self.spans), **counters}
+
+
+class MetricsRegistry:
+    """Process-wide totals fed by every ScanMetrics, rendered as Prometheus text"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = Counter()
+        self._durations = defaultdict(lambda: [0] * (len(DURATION_BUCKETS) + 1))
+        self._duration_sums = Counter()
+        self._subscribers = []
+
+    def subscribe(self, fn):
+        """Receive events from every scan in the process"""
+        self._subscribers.append(fn)
+        return fn
+
+    def handle(self, event, data):
+        with self._lock:
+            if event == 'span':
+                self._observe_duration(data['name'], data['seconds'])
+                if not data['ok']:
+                    self._counters[('moriarty_check_failures_total', ('check', data['name']))] += 1
+            elif event == 'request':
+                status = f"{data['status'] // 100}xx" if data['status'] else 'none'
+                self._counters[('moriarty_http_requests_total', ('status', status))] += 1
+                self._counters[('moriarty_http_bytes_total', None)] += data['bytes']
+                self._counters[('moriarty_http_retries_total', None)] += data['retries']
+            elif event == 'error':
+                self._counters[('moriarty_http_requests_total', ('status', data['kind']))] += 1
+                if data['kind'] == 'timeout':
+                    self._counters[('moriarty_http_timeouts_total', None)] += 1
+            elif event == 'connect':
+                self._counters[('moriarty_port_probes_total', ('state', data['state']))] += 1
+        for fn in list(self._subscribers):
+            fn(event, data)
+
+    def count(self, name, amount=1, label=None):
+        """Bump a counter not tied to a scan (e.g. scans started)"""
+        with self._lock:
+            self._counters[(name, label)] += amount
+
+    def _observe_duration(self, check, seconds):
+        buckets = self._durations[check]
+        for i, bound in enumerate(DURATION_BUCKETS):
+            if seconds <= bound:
+                buckets[i] += 1
+                break
+        else:
+            buckets[-1] += 1
+        self._duration_sums[check] += seconds
+
+    def render_prometheus(self, extra=None):
+        """
+        Text exposition format. `extra` is an optional list of
+        (name, labels_dict, value) gauges appended at the end.
+        """
+        lines = []
+        with self._lock:
+            by_name = defaultdict(list)
+            for (name, label), value in sorted(self._counters.items(), key=lambda kv: str(kv[0])):
+                by_name[name].append((label, value))
+            for name, samples in by_name.items():
+                lines.append(f'# TYPE {name} counter')
+                for label, value in samples:
+                    labels = f'{{{label[0]}="{label[1]}"}}' if label else ''
+                    lines.append(f'{name}{labels} {value}')
+
+            if self._durations:
+                name = 'moriarty_check_duration_seconds'
+                lines.append(f'# TYPE {name} histogram')
+                for check, buckets in sorted(self._durations.items()):
+                    cumulative = 0
+                    for bound, n in zip(DURATION_BUCKETS, buckets):
+                        cumulative += n
+                        lines.append(f'{name}_bucket{{check="{check}",le="{bound}"}} {cumulative}')
+                    cumulative += buckets[-1]
+                    lines.append(f'{name}_bucket{{check="{check}",le="+Inf"}} {cumulative}')
+                    lines.append(f'{name}_sum{{check="{check}"}} {self._duration_sums[check]:.4f}')
+                    lines.append(f'{name}_count{{check="{check}"}} {cumulative}')
+
+        typed = set()
+        for name, labels, value in extra or []:
+            if name not in typed:
+                typed.add(name)
+                lines.append(f'# TYPE {name} gauge')
+            label_text = ','.join(f'{k}="{v}"' for k, v in labels.items())
+            lines.append(f'{name}{{{label_text}}} {value}' if label_text else f'{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+# Process-wide registry behind /metrics
+default_registry = MetricsRegistry()
@@ -0,0 +1,122 @@
+# Streaming NDJSON (JSON Lines) output for batch runs
+# One record per target, flushed as soon as the target finishes; optionally
+# a column-oriented JSON file written once the batch is done
+import json
+import os
+import sys
+
+from core.recon import target_key
+from core.results import ColumnBuilder
+
+
+def to_json_line(record):
+    """Compact single-line JSON for one record"""
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=str)
+
+
+def load_completed(path):
+    """
+    Host keys of targets already written to a JSONL file.
+    Unreadable lines (e.g. a record cut off by a crash) are ignored.
+    """
+    completed = set()
+    if not os.path.exists(path):
+        return completed
+    with open(path, encoding='utf-8') as fh:
+        for line in fh:
+            try:
+                target = json.loads(line)['target']
+            except (ValueError, KeyError, TypeError):
+                continue
+            completed.add(target_key(target))
+    return completed
+
+
+def _drop_partial_line(path):
+    """Truncate a trailing half-written record so appended lines stay valid"""
+    with open(path, 'rb+') as fh:
+        fh.seek(0, os.SEEK_END)
+        size = fh.tell()
+        if size == 0:
+            return
+        fh.seek(size - 1)
+        if fh.read(1) == b'\n':
+            return
+        data = b''
+        pos = size
+        while pos > 0:
+            step = min(4096, pos)
+            pos -= step
+            fh.seek(pos)
+            data = fh.read(step) + data
+            cut = data.rfind(b'\n')
+            if cut != -1:
+                fh.truncate(pos + cut + 1)
+                return
+        fh.truncate(0)
+
+
+class JsonlWriter:
+    """
+    Append-only JSONL sink. With resume=True an existing file is kept and
+    `completed` holds the targets that can be skipped.
+    Use '-' as path to stream to stdout.
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.completed = set()
+        if path == '-':
+            self._fh = sys.stdout
+            return
+
+        if resume and os.path.exists(path):
+            _drop_partial_line(path)
+            self.completed = load_completed(path)
+            self._fh = open(path, 'a', encoding='utf-8')
+        else:
+            self._fh = open(path, 'w', encoding='utf-8')
+
+    def write(self, record):
+        self._fh.write(to_json_line(record) + '\n')
+        self._fh.flush()
+
+    def close(self):
+        if self._fh is not sys.stdout:
+            self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ColumnarWriter:
+    """
+    Collects ScanRecords as columns (see core.results.ColumnBuilder) and
+    writes them as one JSON object {column: [values]} on close().
+    `result_types` is {check name: Result subclass}, e.g. result_types(checks).
+    """
+
+    def __init__(self, path, result_types):
+        self.path = path
+        self._columns = ColumnBuilder(result_types)
+
+    def write(self, record):
+        self._columns.append(record)
+
+    def close(self):
+        data = json.dumps(self._columns.columns, ensure_ascii=False, separators=(',', ':'),
+                          default=str)
+        if self.path == '-':
+            sys.stdout.write(data + '\n')
+            return
+        with open(self.path, 'w', encoding='utf-8') as fh:
+            fh.write(data + '\n')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,114 @@
+# Full single-target scan: the selected checks share one session and engine
+import time
+
+from core.checks import CHECKS, CheckContext, root_url, run_checks, select_checks
+from core.engine import engine_scope, run_sync
+from core.metrics import ScanMetrics, default_registry
+from core.resolver import default_resolver
+from core.results import ScanRecord
+from core.session import session_scope
+
+# Checks answered from the target's root page; a 304 on it keeps them valid
+ROOT_PAGE_CHECKS = ('recon', 'headers')
+
+
+def scan_target(url, session=None, engine=None, on_check=None, resolver=None,
+                store=None, incremental=False, max_age=None, checks=None, metrics=None,
+                wordlist=None, shared=None):
+    """
+    Run recon and the security checks (or the `checks` subset) against one
+    target. Returns a ScanRecord; record.to_dict() is its JSON form.
+    """
+    return run_sync(scan_target_async(url, session, engine, on_check, resolver,
+                                      store, incremental, max_age, checks, metrics, wordlist,
+                                      shared))
+
+
+async def scan_target_async(url, session=None, engine=None, on_check=None, resolver=None,
+                            store=None, incremental=False, max_age=None, checks=None,
+                            metrics=None, wordlist=None, shared=None):
+    """
+    Async full scan. The planner runs independent checks concurrently and
+    they share one pooled, caching ScanSession, so the root page is only
+    fetched once. `checks` selects a subset by name (see core.checks).
+    on_check(name, result, seconds) is called as each check finishes, with
+    the check's typed result (see core.results).
+
+    With a ResultStore every fresh result is saved. With incremental=True,
+    checks whose stored result is younger than max_age[check] are reused,
+    and stale root-page checks are revalidated with a conditional GET.
+
+    Spans and request counters go to `metrics` (a fresh ScanMetrics by
+    default) and end up in record.metrics. A caller-supplied session
+    reports HTTP counters to its own metrics instead.
+
+    `wordlist` (file path or iterable) replaces the built-in admin paths;
+    a stored admin result is then never reused.
+
+    `shared` (a core.checks.AddressResults) lets address-scoped checks such
+    as ports run once per IP across a batch; record.shared lists the
+    checks this target got from another one.
+    """
+    selected = select_checks(checks)
+    timings = {}
+    started = time.time()
+    metrics = ScanMetrics() if metrics is None else metrics
+    default_registry.count('moriarty_scans_total')
+    with session_scope(session, metrics=metrics) as http, engine_scope(engine) as eng:
+        ctx = CheckContext(url, http, eng, resolver or default_resolver, metrics, wordlist,
+                           shared)
+        reused = {}
+        if store is not None and incremental:
+            reused = await _reusable_results(store, url, http, eng, max_age, selected)
+            if wordlist is not None:
+                reused.pop('admin', None)
+            for name, result in reused.items():
+                if on_check:
+                    on_check(name, result, 0.0)
+
+        results = await run_checks(ctx, selected, done=reused, on_check=on_check,
+                                   timings=timings)
+
+        if store is not None:
+            fresh = {name: results[name] for name in selected if name not in reused}
+            page = (results.get('root') or {}).get('url')
+            _save_results(store, url, http, fresh, started, page)
+
+    return ScanRecord(url, round(started, 3), selected,
+                      {name: results[name] for name in selected}, timings,
+                      sorted(reused), metrics.to_dict(), shared=ctx.shared_checks)
+
+
+async def _reusable_results(store, url, http, eng, max_age, selected):
+    """Stored results that are still fresh, plus root-page ones confirmed by a 304"""
+    fresh, stale = store.fresh(url, max_age)
+    fresh = {name: CHECKS[name].result.from_dict(result)
+             for name, result in fresh.items() if name in selected}
+    revalidate = [name for name in ROOT_PAGE_CHECKS if name in stale and name in selected]
+    if not revalidate:
+        return fresh
+
+    row = stale[revalidate[0]]
+    if not (row['etag'] or row['last_modified']):
+        return fresh
+    # The page the validators came from: the scheme that answered last time
+    page = row.get('page_url') or root_url(url)
+    if await eng.run(http.revalidate, page, row['etag'], row['last_modified']):
+        for name in revalidate:
+            fresh[name] = CHECKS[name].result.from_dict(stale[name]['result'])
+            store.touch(url, name)
+    return fresh
+
+
+def _save_results(store, url, http, results, scanned_at, page=None):
+    """Persist successful check results with the root page's (`page`) validators"""
+    page = page or root_url(url)
+    root = http.cached(page)
+    etag = root.headers.get('ETag') if root else None
+    last_modified = root.headers.get('Last-Modified') if root else None
+    for name, result in results.items():
+        # Errors are not worth remembering; the next run should retry
+        if not result.ok:
+            continue
+        store.put(url, name, result.to_dict(), etag, last_modified, scanned_at,
+                  page if root else None)
@@ -0,0 +1,359 @@
+# Non-blocking TCP connect scanner
+# One selector loop (epoll/kqueue where available) keeps many connects in
+# flight under global and per-host caps and reports every port as soon as
+# its state is known
+import errno
+import heapq
+import ipaddress
+import itertools
+import selectors
+import socket
+import struct
+import time
+from collections import deque
+from urllib.parse import urlparse
+
+from core.latency import LatencyTracker
+from core.results import PortProbe
+
+# Named port sets usable in a port spec
+PORT_SETS = {
+    'common': [21, 22, 23, 25, 53, 80, 110, 143, 443, 993, 995],
+    'web': [80, 443, 8000, 8008, 8080, 8443, 8888],
+    'mail': [25, 110, 143, 465, 587, 993, 995],
+    'db': [1433, 1521, 3306, 5432, 6379, 9200, 11211, 27017],
+    'remote': [22, 23, 3389, 5900, 5985, 5986],
+}
+
+# Adaptive connect timeouts never drop below this (seconds)
+PORT_TIMEOUT_FLOOR = 0.25
+
+# Unanswered connects in a row (with no answer before) after which a host is left alone
+PORT_FAILURES_TO_SKIP = 8
+
+# Sockets left for everything else the process has open
+FD_RESERVE = 64
+
+# Largest CIDR block expand_targets() accepts (a /16 of IPv4)
+MAX_CIDR_ADDRESSES = 1 << 16
+
+# Host names resolved together while expanding targets
+RESOLVE_CHUNK = 256
+
+# connect_ex() results meaning "in progress, wait for writability"
+_IN_PROGRESS = {errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY, errno.EAGAIN}
+
+# Close with RST instead of FIN so thousands of probes leave no TIME_WAIT behind
+_LINGER_RESET = struct.pack('ii', 1, 0)
+
+
+def parse_ports(spec=None):
+    """
+    Sorted unique ports from a spec such as 'web,22,8000-8100' (set names,
+    single ports and inclusive ranges), or from an iterable of ints.
+    None means the 'common' set. Raises ValueError for anything invalid.
+    """
+    if spec is None:
+        return list(PORT_SETS['common'])
+    if isinstance(spec, str):
+        items = [item.strip() for item in spec.replace(' ', ',').split(',') if item.strip()]
+    else:
+        items = list(spec)
+
+    ports = set()
+    for item in items:
+        if isinstance(item, str) and item.lower() in PORT_SETS:
+            ports.update(PORT_SETS[item.lower()])
+            continue
+        try:
+            if isinstance(item, str) and '-' in item:
+                low, high = (int(p) for p in item.split('-', 1))
+            else:
+                low = high = int(item)
+        except ValueError:
+            raise ValueError(f'Invalid port or set: {item!r} (sets: {", ".join(PORT_SETS)})')
+        if not 1 <= low <= high <= 65535:
+            raise ValueError(f'Port out of range: {item!r}')
+        ports.update(range(low, high + 1))
+    if not ports:
+        raise ValueError('No ports selected')
+    return sorted(ports)
+
+
+def parse_network(item, max_addresses=MAX_CIDR_ADDRESSES):
+    """
+    The ip_network of an IP address or CIDR block, or None for anything
+    else (a host name or URL). Raises ValueError for a block with more than
+    `max_addresses` addresses.
+    """
+    try:
+        network = ipaddress.ip_network(item, strict=False)
+    except ValueError:
+        return None
+    if network.num_addresses > max_addresses:
+        raise ValueError(f'{item} has {network.num_addresses} addresses, more than the limit of '
+                         f'{max_addresses}; split it into smaller blocks')
+    return network
+
+
+def expand_targets(items, resolver=None, max_addresses=MAX_CIDR_ADDRESSES):
+    """
+    Generator of (host, address) for IP addresses, CIDR blocks (IPv4 or
+    IPv6, every usable address, produced one at a time) and host names /
+    URLs (first resolved address; None if they do not resolve). Names are
+    resolved in chunks of RESOLVE_CHUNK. Order follows `items`. Blocks over
+    `max_addresses` raise ValueError when they are reached.
+    """
+    names = []
+
+    def resolved():
+        nonlocal resolver
+        if resolver is None:
+            from core.resolver import default_resolver as resolver
+        answers = resolver.resolve_many(names)
+        for host in names:
+            addresses = answers[host]['ipv4'] + answers[host]['ipv6']
+            yield host, addresses[0] if addresses else None
+        names.clear()
+
+    for item in items:
+        item = str(item).strip()
+        if not item or item.startswith('#'):
+            continue
+        network = parse_network(item, max_addresses)
+        if network is None:
+            names.append(urlparse(item if '://' in item else '//' + item).hostname or item)
+            if len(names) >= RESOLVE_CHUNK:
+                yield from resolved()
+            continue
+        if names:
+            yield from resolved()
+        if network.num_addresses == 1:
+            yield str(network.network_address), str(network.network_address)
+            continue
+        for address in network.hosts():
+            yield str(address), str(address)
+    if names:
+        yield from resolved()
+
+
+def fd_budget(reserve=FD_RESERVE):
+    """How many sockets may be open at once under RLIMIT_NOFILE"""
+    try:
+        import resource
+    except ImportError:
+        return 512 - reserve
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft == resource.RLIM_INFINITY:
+        return 1 << 16
+    return max(1, soft - reserve)
+
+
+def raise_fd_limit(wanted):
+    """Best effort: lift the soft RLIMIT_NOFILE towards `wanted` (capped at the hard limit)"""
+    try:
+        import resource
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        target = wanted if hard == resource.RLIM_INFINITY else min(wanted, hard)
+        if soft != resource.RLIM_INFINITY and soft < target:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+    except (ImportError, ValueError, OSError):
+        pass
+
+
+class _Probe:
+    __slots__ = ('host', 'address', 'port', 'sock', 'started')
+
+    def __init__(self, host, address, port, sock, started):
+        self.host = host
+        self.address = address
+        self.port = port
+        self.sock = sock
+        self.started = started
+
+
+class PortScanner:
+    """
+    TCP connect scan of many hosts from one thread.
+
+    - concurrency: connects in flight in total (also capped by fd_budget())
+    - per_host:    connects in flight against one address
+    - timeout:     longest wait for an answer; a LatencyTracker shortens it
+                   per address once answers come in, and an address whose
+                   first PORT_FAILURES_TO_SKIP probes all went unanswered
+                   has its remaining ports reported as 'skipped'
+    - metrics:     ScanMetrics receiving a 'connect' event per probe
+
+    Hosts are served round-robin, so many hosts make progress at once.
+    New hosts are only read from `targets` when the ones being scanned
+    leave room, so a large range streams through in bounded memory.
+    """
+
+    def __init__(self, timeout=2, concurrency=1000, per_host=100, latency=None, metrics=None):
+        self.timeout = timeout
+        self.concurrency = max(1, min(concurrency, fd_budget()))
+        self.per_host = max(1, per_host)
+        self.latency = latency or LatencyTracker(floor=PORT_TIMEOUT_FLOOR,
+                                                 failures_to_skip=PORT_FAILURES_TO_SKIP)
+        self.metrics = metrics
+
+    def scan(self, targets, ports):
+        """
+        Generator of PortProbe results, in the order they are settled.
+        `targets` is an iterable of (host, address) (see expand_targets), read
+        only as fast as hosts are taken on; an address of None gives one
+        'skipped' probe per port. `ports` is a list or spec.
+        """
+        ports = parse_ports(ports) if isinstance(ports, str) or ports is None else list(ports)
+        selector = selectors.DefaultSelector()
+        targets = iter(targets)
+        seen = set()
+        # Hosts being scanned: (host, address) -> index of their next port
+        next_port = {}
+        in_flight = {}
+        rotation = deque()
+        exhausted = False
+
+        pending = {}
+        deadlines = []
+        ids = itertools.count()
+        settled = deque()
+        total = 0
+
+        def admit():
+            """Take on the next new host; False once there are none left"""
+            nonlocal exhausted
+            for key in targets:
+                if key not in seen:
+                    seen.add(key)
+                    next_port[key] = 0
+                    rotation.append(key)
+                    return True
+            exhausted = True
+            return False
+
+        def finish(probe_id, state, error=None):
+            nonlocal total
+            probe = pending.pop(probe_id)
+            if probe.sock is not None:
+                try:
+                    selector.unregister(probe.sock)
+                except (KeyError, ValueError):
+                    pass
+                _close(probe.sock)
+            in_flight[probe.address] -= 1
+            if not in_flight[probe.address]:
+                del in_flight[probe.address]
+            total -= 1
+            settled.append(self._result(probe, state, error))
+
+        def start(key):
+            nonlocal total
+            host, address = key
+            port = ports[next_port[key]]
+            next_port[key] += 1
+            now = time.monotonic()
+            if address is None or self.latency.unreachable(address):
+                settled.append(self._result(_Probe(host, address, port, None, now), 'skipped',
+                                            None if address else 'unresolved'))
+                return
+            try:
+                sock = socket.socket(_family(address), socket.SOCK_STREAM)
+            except OSError as e:
+                settled.append(self._result(_Probe(host, address, port, None, now), 'filtered',
+                                            errno.errorcode.get(e.errno, str(e))))
+                return
+            sock.setblocking(False)
+            probe_id = next(ids)
+            pending[probe_id] = _Probe(host, address, port, sock, now)
+            in_flight[address] = in_flight.get(address, 0) + 1
+            total += 1
+            code = sock.connect_ex((address, port))
+            if code in _IN_PROGRESS:
+                selector.register(sock, selectors.EVENT_WRITE, probe_id)
+                deadline = now + self.latency.timeout(address, self.timeout)
+                heapq.heappush(deadlines, (deadline, probe_id))
+            else:
+                finish(probe_id, *_classify(code))
+
+        def fill():
+            # Round-robin over hosts with ports left and room under their cap;
+            # a new host is taken on only when none of them has room
+            idle = 0
+            while total < self.concurrency:
+                if idle >= len(rotation):
+                    if exhausted or not admit():
+                        break
+                    idle = 0
+                    continue
+                key = rotation[0]
+                rotation.rotate(-1)
+                if next_port[key] >= len(ports):
+                    rotation.remove(key)
+                    del next_port[key]
+                    continue
+                if in_flight.get(key[1], 0) >= self.per_host:
+                    idle += 1
+                    continue
+                start(key)
+                idle = 0
+
+        try:
+            fill()
+            while settled or pending or rotation or not exhausted:
+                while settled:
+                    yield settled.popleft()
+                if not pending:
+                    fill()
+                    continue
+
+                wait = max(0.0, deadlines[0][0] - time.monotonic()) if deadlines else None
+                for selector_key, _ in selector.select(wait):
+                    probe_id = selector_key.data
+                    code = selector_key.fileobj.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                    finish(probe_id, *_classify(code))
+
+                now = time.monotonic()
+                while deadlines and deadlines[0][0] <= now:
+                    _, probe_id = heapq.heappop(deadlines)
+                    if probe_id in pending:
+                        finish(probe_id, 'filtered', 'timeout')
+                fill()
+        finally:
+            for probe_id in list(pending):
+                probe = pending.pop(probe_id)
+                _close(probe.sock)
+            selector.close()
+
+    def _result(self, probe, state, error=None):
+        seconds = time.monotonic() - probe.started
+        if state in ('open', 'closed'):
+            # A refusal is still an answer: the host is up
+            self.latency.observe(probe.address, seconds)
+        elif state == 'filtered':
+            self.latency.failed(probe.address)
+        if self.metrics is not None:
+            self.metrics.record_connect(probe.address, probe.port, state, seconds)
+        return PortProbe(host=probe.host, address=probe.address, port=probe.port, state=state,
+                         seconds=round(seconds, 4), error=error)
+
+
+def _family(address):
+    return socket.AF_INET6 if ':' in address else socket.AF_INET
+
+
+def _classify(code):
+    """(state, error) for a connect() errno"""
+    if code == 0:
+        return 'open', None
+    if code == errno.ECONNREFUSED:
+        return 'closed', None
+    return 'filtered', errno.errorcode.get(code, str(code))
+
+
+def _close(sock):
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, _LINGER_RESET)
+    except OSError:
+        pass
+    sock.close()
@@ -1,7 +1,11 @@
-import socket
-import requests
+import asyncio
 from urllib.parse import urlparse
 
+from core.engine import engine_scope, run_sync
+from core.resolver import default_resolver
+from core.results import ReconResult
+from core.session import session_scope
+
 
 def get_hostname_from_input(url_or_domain):
     """Extract hostname from URL or domain input"""
@@ -13,56 +17,204 @@ def get_hostname_from_input(url_or_domain):
     return parsed.netloc
 
 
-def recon(url_or_domain, timeout=5):
+def target_key(url_or_domain):
+    """Host a target points at, used to drop duplicates like 'Example.com' and 'http://example.com/'"""
+    url = url_or_domain if '://' in url_or_domain else 'http://' + url_or_domain
+    parsed = urlparse(url)
+    host = (parsed.hostname or '').rstrip('.')
+    if parsed.port and parsed.port not in (80, 443):
+        host = f'{host}:{parsed.port}'
+    return host
+
+
+# Once one scheme has answered, the other gets at least this long (or as
+# long again as the first took) before it is abandoned
+SCHEME_GRACE = 0.5
+
+
+def recon(url_or_domain, timeout=5, session=None, engine=None, resolver=None):
     """
     Return basic reconnaissance information including:
     - IP address resolution
     - HTTP response details
-    - Security indicators (HTTPS usage)
+    - Security indicators (HTTPS usage, redirect to HTTPS, HSTS)
     - Server/technology detection
+
+    Returns a ReconResult. Pass a ScanSession to reuse its pooled connections across checks.
+    """
+    return run_sync(recon_async(url_or_domain, timeout, session, engine, resolver))
+
+
+async def recon_async(url_or_domain, timeout=5, session=None, engine=None, resolver=None,
+                      probe=None):
+    """
+    Async recon: the DNS lookup and the HTTP/HTTPS probes run concurrently.
+    `probe` is a SchemeProbe started earlier in the scan (the pipeline's
+    root check); when given, the schemes are not requested again.
     """
     host = get_hostname_from_input(url_or_domain)
-    result = {'host': host}
-    
-    # DNS resolution
-    try:
-        ip = socket.gethostbyname(host)
-        result['ip'] = ip
-    except Exception as e:
-        result['ip_error'] = str(e)
-
-    # HTTP reconnaissance
-    try:
-        # Try HTTP first
-        r = requests.get(('http://' + host), timeout=timeout, allow_redirects=True)
-        result['final_url'] = r.url
-        result['status_code'] = r.status_code
-        
-        # Extract useful headers for security analysis
-        headers = r.headers
-        result['server'] = headers.get('Server')
-        result['x_powered_by'] = headers.get('X-Powered-By')
-        result['content_type'] = headers.get('Content-Type')
-        
-        # Check if redirected to HTTPS
-        result['uses_https'] = r.url.startswith('https://')
-        
-    except Exception as e:
-        result['http_error'] = str(e)
-        
-        # Try HTTPS if HTTP failed
-        try:
-            r = requests.get(('https://' + host), timeout=timeout, allow_redirects=True)
-            result['final_url'] = r.url
-            result['status_code'] = r.status_code
-            result['uses_https'] = True
-            
-            headers = r.headers
-            result['server'] = headers.get('Server')
-            result['x_powered_by'] = headers.get('X-Powered-By')
-            result['content_type'] = headers.get('Content-Type')
-            
-        except Exception as e2:
-            result['https_error'] = str(e2)
+    result = ReconResult(host=host)
+
+    with session_scope(session, timeout=timeout) as http, engine_scope(engine) as eng:
+        if probe is None:
+            probe = SchemeProbe(http, eng, host, timeout)
+        _, schemes = await asyncio.gather(
+            eng.run(_dns_recon, resolver or default_resolver, host, result),
+            probe.settle(),
+        )
 
+    _apply_probe(result, probe, schemes)
     return result
+
+
+def _dns_recon(resolver, host, result):
+    """Resolve the host (A and AAAA) through the shared caching resolver"""
+    answer = resolver.resolve(host)
+    if 'error' in answer:
+        result.ip_error = answer['error']
+        return
+    
+    # 'ip' stays the primary IPv4 address for existing callers
+    if answer['ipv4']:
+        result.ip = answer['ipv4'][0]
+    else:
+        result.ip = answer['ipv6'][0]
+    result.ipv4 = list(answer['ipv4'])
+    result.ipv6 = list(answer['ipv6'])
+
+
+class SchemeProbe:
+    """
+    http:// and https:// requests to one host, racing (happy-eyeballs style).
+
+    first() settles which scheme to use: HTTP when it answers in time, so a
+    redirect to HTTPS stays visible, otherwise HTTPS. settle() also waits
+    for the other scheme's outcome. Once one scheme has answered, the other
+    gets a grace period and is then abandoned instead of waited out.
+    Must be created inside a running event loop.
+    """
+
+    SCHEMES = ('http', 'https')
+
+    def __init__(self, http, eng, host, timeout=None):
+        self.host = host
+        self.outcomes = {}
+        self.grace = None
+        self._loop = asyncio.get_running_loop()
+        self._started = self._loop.time()
+        self._deadline = None
+        self._gave_up = False
+        self._tasks = {
+            scheme: asyncio.ensure_future(eng.run(http.fetch, f'{scheme}://{host}',
+                                                  timeout=timeout, allow_redirects=True))
+            for scheme in self.SCHEMES
+        }
+        for task in self._tasks.values():
+            # Nobody may ever settle() (recon not selected); keep the loser's error quiet
+            task.add_done_callback(_retrieve)
+
+    @property
+    def scheme(self):
+        for scheme in self.SCHEMES:
+            if self._ok(scheme):
+                return scheme
+        return None
+
+    @property
+    def url(self):
+        return f'{self.scheme}://{self.host}' if self.scheme else None
+
+    @property
+    def response(self):
+        return self.outcomes[self.scheme] if self.scheme else None
+
+    async def first(self):
+        """The chosen scheme's response, or None if neither answered"""
+        await self._collect(self._decided)
+        return self.response
+
+    async def settle(self):
+        """{scheme: outcome} for both schemes, see _describe_scheme"""
+        await self._collect(lambda: False)
+        schemes = {}
+        for scheme in self.SCHEMES:
+            if scheme in self.outcomes:
+                schemes[scheme] = _describe_scheme(scheme, self.outcomes[scheme])
+            else:
+                schemes[scheme] = {'error': f'No answer within {self.grace:.1f}s of the other scheme'}
+        return schemes
+
+    def _ok(self, scheme):
+        return scheme in self.outcomes and not isinstance(self.outcomes[scheme], Exception)
+
+    def _decided(self):
+        return self._ok('http') or ('http' in self.outcomes and 'https' in self.outcomes)
+
+    async def _collect(self, until):
+        while not until() and not self._gave_up:
+            pending = [t for s, t in self._tasks.items() if s not in self.outcomes]
+            if not pending:
+                return
+            wait = None if self._deadline is None else max(0.0, self._deadline - self._loop.time())
+            done, _ = await asyncio.wait(pending, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                self._gave_up = True
+                for task in pending:
+                    task.cancel()
+                return
+            for scheme, task in self._tasks.items():
+                if task not in done:
+                    continue
+                try:
+                    self.outcomes[scheme] = task.result()
+                except Exception as e:
+                    self.outcomes[scheme] = e
+                if self._deadline is None and self._ok(scheme):
+                    self.grace = max(SCHEME_GRACE, self._loop.time() - self._started)
+                    self._deadline = self._loop.time() + self.grace
+
+
+def _retrieve(task):
+    if not task.cancelled():
+        task.exception()
+
+
+def _describe_scheme(scheme, outcome):
+    """Status, redirect behaviour and HSTS of one scheme's probe"""
+    if isinstance(outcome, Exception):
+        return {'error': str(outcome)}
+    secure = outcome.url.startswith('https://')
+    info = {
+        'status_code': outcome.status_code,
+        'final_url': outcome.url,
+        'redirects': outcome.redirects,
+    }
+    if scheme == 'http':
+        info['redirects_to_https'] = secure
+    # Browsers ignore HSTS sent over plain HTTP
+    info['hsts'] = outcome.headers.get('Strict-Transport-Security') if secure else None
+    return info
+
+
+def _apply_probe(result, probe, schemes):
+    """Fill in HTTP details from the chosen scheme and record both outcomes"""
+    result.http_error = schemes['http'].get('error')
+    result.https_error = schemes['https'].get('error')
+
+    r = probe.response
+    if r is not None:
+        _describe_response(result, r)
+        result.uses_https = r.url.startswith('https://')
+    result.schemes = schemes
+
+
+def _describe_response(result, r):
+    """Copy status and fingerprinting headers from a (cached) response"""
+    result.final_url = r.url
+    result.status_code = r.status_code
+    
+    # Extract useful headers for security analysis
+    headers = r.headers
+    result.server = headers.get('Server')
+    result.x_powered_by = headers.get('X-Powered-By')
+    result.content_type = headers.get('Content-Type')
@@ -0,0 +1,148 @@
+# DNS resolver with an in-process TTL cache
+# Shared by recon, port scanning and batch scheduling so each host is looked up once
+import asyncio
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def strip_port(host):
+    """'example.com:8080' -> 'example.com', '[::1]:80' -> '::1'"""
+    if host.startswith('['):
+        return host[1:].split(']', 1)[0]
+    if host.count(':') == 1:
+        return host.split(':', 1)[0]
+    return host
+
+
+class Resolver:
+    """
+    Caching A/AAAA resolver on top of the system getaddrinfo.
+
+    - successful lookups are cached for `ttl` seconds
+    - failures are cached for `negative_ttl` seconds
+    - concurrent lookups of the same name wait for a single query
+    - resolve_many()/resolve_many_async() resolve batches in parallel
+    """
+
+    def __init__(self, ttl=300, negative_ttl=30, max_entries=10000, concurrency=32):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.concurrency = concurrency
+        self._cache = {}
+        self._lock = threading.Lock()
+        self._host_locks = {}
+
+    def resolve(self, host):
+        """
+        Return {'host', 'ipv4': [...], 'ipv6': [...]} or, when the name
+        does not resolve, {'host', 'ipv4': [], 'ipv6': [], 'error': '...'}.
+        """
+        host = strip_port(host).lower().rstrip('.')
+        cached = self._lookup(host)
+        if cached is not None:
+            return cached
+
+        with self._host_lock(host):
+            # Another thread may have finished the same query meanwhile
+            cached = self._lookup(host)
+            if cached is not None:
+                return cached
+            answer = self._query(host)
+            ttl = self.negative_ttl if 'error' in answer else self.ttl
+            self._store(host, answer, ttl)
+            return answer
+
+    def first_address(self, host):
+        """Preferred address for connecting: first IPv4, else first IPv6, else None"""
+        answer = self.resolve(host)
+        addresses = answer['ipv4'] + answer['ipv6']
+        return addresses[0] if addresses else None
+
+    def resolve_many(self, hosts):
+        """Resolve many names in parallel; returns {host: answer}"""
+        hosts = list(dict.fromkeys(hosts))
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            return dict(zip(hosts, pool.map(self.resolve, hosts)))
+
+    async def resolve_async(self, host):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.resolve, host)
+
+    async def first_address_async(self, host):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.first_address, host)
+
+    async def resolve_many_async(self, hosts):
+        hosts = list(dict.fromkeys(hosts))
+        sem = asyncio.Semaphore(self.concurrency)
+
+        async def one(host):
+            async with sem:
+                return await self.resolve_async(host)
+
+        answers = await asyncio.gather(*(one(h) for h in hosts))
+        return dict(zip(hosts, answers))
+
+    def prime(self, answers):
+        """Seed the cache with answers resolved elsewhere (e.g. by a parent process)"""
+        for host, answer in answers.items():
+            ttl = self.negative_ttl if 'error' in answer else self.ttl
+            self._store(strip_port(host).lower().rstrip('.'), answer, ttl)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._host_locks.clear()
+
+    def _query(self, host):
+        try:
+            infos = socket.getaddrinfo(host, None, socket.AF_UNSPEC, socket.SOCK_STREAM)
+        except (OSError, UnicodeError) as e:
+            return {'host': host, 'ipv4': [], 'ipv6': [], 'error': str(e)}
+
+        answer = {'host': host, 'ipv4': [], 'ipv6': []}
+        for family, _, _, _, sockaddr in infos:
+            key = 'ipv4' if family == socket.AF_INET else 'ipv6' if family == socket.AF_INET6 else None
+            if key and sockaddr[0] not in answer[key]:
+                answer[key].append(sockaddr[0])
+        return answer
+
+    def _lookup(self, host):
+        with self._lock:
+            entry = self._cache.get(host)
+        if entry is None:
+            return None
+        answer, expires = entry
+        if expires < time.monotonic():
+            return None
+        return answer
+
+    def _store(self, host, answer, ttl):
+        with self._lock:
+            if len(self._cache) >= self.max_entries:
+                self._prune()
+            self._cache[host] = (answer, time.monotonic() + ttl)
+
+    def _prune(self):
+        now = time.monotonic()
+        stale = [h for h, (_, exp) in self._cache.items() if exp < now]
+        # Still full: drop the oldest inserted half
+        if len(self._cache) - len(stale) >= self.max_entries:
+            stale = list(self._cache)[:len(self._cache) // 2]
+        for host in stale:
+            self._cache.pop(host, None)
+            self._host_locks.pop(host, None)
+
+    def _host_lock(self, host):
+        with self._lock:
+            lock = self._host_locks.get(host)
+            if lock is None:
+                lock = self._host_locks[host] = threading.Lock()
+            return lock
+
+
+# Process-wide resolver used when a caller does not pass its own
+default_resolver = Resolver()
@@ -0,0 +1,211 @@
+# Typed check results
+# Every selectable check returns one of these slotted records instead of a
+# free-form dict or list; scan records and batch columns are built from them
+class Result:
+    """
+    Base for check results. Fields are the class's __slots__; unset ones
+    are None.
+
+    - to_dict() / from_dict(): compact JSON form, None fields left out
+    - to_row() / from_row():   field values as a tuple, in slot order
+    - ok:                      False when the check itself failed
+    """
+
+    __slots__ = ()
+
+    # Field a bare JSON list is read into (results stored before these types existed)
+    list_field = None
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.pop(name, None))
+        if fields:
+            raise TypeError(f'{type(self).__name__} has no field(s) {", ".join(fields)}')
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def to_dict(self):
+        return {name: value for name in self.__slots__
+                if (value := getattr(self, name)) is not None}
+
+    @classmethod
+    def from_dict(cls, data):
+        if cls.list_field and isinstance(data, list):
+            return cls(**{cls.list_field: data})
+        return cls(**{name: data[name] for name in cls.__slots__ if name in data})
+
+    def to_row(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(**dict(zip(cls.__slots__, row)))
+
+    def __getstate__(self):
+        return self.to_row()
+
+    def __setstate__(self, row):
+        for name, value in zip(self.__slots__, row):
+            setattr(self, name, value)
+
+    def __eq__(self, other):
+        return type(other) is type(self) and other.to_row() == self.to_row()
+
+    def __repr__(self):
+        fields = ', '.join(f'{k}={v!r}' for k, v in self.to_dict().items())
+        return f'{type(self).__name__}({fields})'
+
+
+class ReconResult(Result):
+    """IP addresses, chosen scheme's response details and both schemes' outcomes"""
+
+    __slots__ = ('host', 'ip', 'ipv4', 'ipv6', 'ip_error', 'final_url', 'status_code',
+                 'server', 'x_powered_by', 'content_type', 'uses_https',
+                 'http_error', 'https_error', 'schemes')
+
+    @property
+    def error(self):
+        # Failed only if neither scheme answered
+        if self.status_code is not None:
+            return None
+        return self.http_error or self.https_error or self.ip_error or 'No HTTP response'
+
+
+class HeadersResult(Result):
+    """Security headers missing from the root page"""
+
+    __slots__ = ('missing', 'error')
+    list_field = 'missing'
+
+
+class AdminResult(Result):
+    """
+    Admin/login paths found, paths that redirect to a login page, and
+    {path: {status, length, location}} for both, with the discovery
+    counters (see core.discovery)
+    """
+
+    __slots__ = ('found', 'login_gated', 'pages', 'catch_all', 'probed', 'pruned', 'soft_404',
+                 'redirects', 'error')
+    list_field = 'found'
+
+
+class XssResult(Result):
+    """Parameter names whose payload came back unescaped"""
+
+    __slots__ = ('params', 'error')
+    list_field = 'params'
+
+    @property
+    def reflected(self):
+        return bool(self.params)
+
+
+class PortsResult(Result):
+    """Open TCP ports on the target's first resolved address"""
+
+    __slots__ = ('address', 'open', 'error')
+    list_field = 'open'
+
+
+class PortProbe(Result):
+    """
+    One TCP connect: state is 'open', 'closed' (refused), 'filtered' (no
+    answer or unreachable; `error` names the errno) or 'skipped'
+    """
+
+    __slots__ = ('host', 'address', 'port', 'state', 'seconds', 'error')
+
+
+class ScanRecord:
+    """
+    One target's scan: the typed result of each selected check plus timings.
+    to_dict() is the JSON record written by batches, stores and the web API.
+    A target that could not be scanned at all only has `error` set.
+    `reused` lists checks taken from a ResultStore, `shared` those taken
+    from another target on the same address in a batch.
+    `explanation`, when set, is an object with to_dict() (assistant.Report).
+    """
+
+    __slots__ = ('target', 'scanned_at', 'checks', 'results', 'timings', 'reused', 'shared',
+                 'metrics', 'error', 'explanation', 'postprocess_error')
+
+    def __init__(self, target, scanned_at=None, checks=(), results=None, timings=None,
+                 reused=(), metrics=None, error=None, shared=()):
+        self.target = target
+        self.scanned_at = scanned_at
+        self.checks = list(checks)
+        self.results = results or {}
+        self.timings = timings or {}
+        self.reused = list(reused)
+        self.shared = list(shared)
+        self.metrics = metrics
+        self.error = error
+        self.explanation = None
+        self.postprocess_error = None
+
+    def get(self, check):
+        """Result of `check`, or None if it was not part of the scan"""
+        return self.results.get(check)
+
+    def to_dict(self, fields=None, prose=True):
+        """
+        JSON record; `fields` maps check name -> record key (default: each
+        check's field). prose=False leaves out the explanation.
+        """
+        if self.error is not None:
+            return {'target': self.target, 'error': self.error}
+        if fields is None:
+            # core.checks imports this module, so look the fields up late
+            from core.checks import CHECKS
+            fields = {name: CHECKS[name].field for name in self.results}
+        record = {'target': self.target, 'scanned_at': self.scanned_at, 'checks': self.checks}
+        for name in self.checks:
+            if name in self.results:
+                record[fields[name]] = self.results[name].to_dict()
+        record['timings'] = self.timings
+        record['reused'] = self.reused
+        if self.shared:
+            record['shared'] = self.shared
+        record['metrics'] = self.metrics
+        if prose and self.explanation is not None:
+            record['explanation'] = self.explanation.to_dict()
+        if self.postprocess_error is not None:
+            record['postprocess_error'] = self.postprocess_error
+        return record
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+    def __repr__(self):
+        return f'<ScanRecord {self.target} checks={self.checks} error={self.error!r}>'
+
+
+class ColumnBuilder:
+    """Accumulates ScanRecords as columns, one list per field"""
+
+    def __init__(self, result_types):
+        self.result_types = dict(result_types)
+        self.columns = {'target': [], 'scanned_at': [], 'error': []}
+        for check, cls in self.result_types.items():
+            for name in cls.__slots__:
+                self.columns[f'{check}.{name}'] = []
+
+    def append(self, record):
+        self.columns['target'].append(record.target)
+        self.columns['scanned_at'].append(record.scanned_at)
+        self.columns['error'].append(record.error)
+        for check, cls in self.result_types.items():
+            result = record.results.get(check)
+            row = result.to_row() if result is not None else (None,) * len(cls.__slots__)
+            for name, value in zip(cls.__slots__, row):
+                self.columns[f'{check}.{name}'].append(value)
+
+    def __len__(self):
+        return len(self.columns['target'])
@@ -1,5 +1,21 @@
+import asyncio
+from urllib.parse import urlparse
+
 import requests
-from urllib.parse import urljoin
+
+from core.discovery import discover_paths_async
+from core.engine import engine_scope, run_sync
+from core.latency import LatencyTracker
+from core.portscan import (
+    PORT_FAILURES_TO_SKIP,
+    PORT_SETS,
+    PORT_TIMEOUT_FLOOR,
+    PortScanner,
+    parse_ports,
+)
+from core.resolver import default_resolver
+from core.results import AdminResult, HeadersResult, PortsResult, XssResult
+from core.session import session_scope
 
 # Common administrative interface paths
 COMMON_ADMIN_PATHS = [
@@ -24,105 +40,195 @@ SECURITY_HEADERS = [
     'X-XSS-Protection'
 ]
 
+# Parameter names probed by the reflected XSS test
+XSS_TEST_PARAMS = ['q', 'search', 'query', 'input', 'test']
+
+# Simple test payload that's unlikely to cause harm
+XSS_PAYLOAD = "<s1>moriarty_test</s1>"
+
+# Stop reading a probe response after this many bytes
+XSS_MAX_BYTES = 1024 * 1024
+XSS_CHUNK_SIZE = 16 * 1024
 
-def check_security_headers(url_or_domain, timeout=5):
+# Common ports to check (see core.portscan.PORT_SETS for the others)
+COMMON_PORTS = PORT_SETS['common']
+
+
+def _normalize_target(url_or_domain):
+    host = url_or_domain
+    if not host.startswith('http'):
+        host = 'http://' + host
+    return host
+
+
+def check_security_headers(url_or_domain, timeout=5, session=None, engine=None):
     """
     Check for missing security headers that help protect against
     common web vulnerabilities like clickjacking, XSS, etc.
+    Returns a HeadersResult (`error` set if the page could not be fetched).
     """
-    host = url_or_domain
-    if not host.startswith('http'):
-        host = 'http://' + host
+    return run_sync(check_security_headers_async(url_or_domain, timeout, session, engine))
+
+
+async def check_security_headers_async(url_or_domain, timeout=5, session=None, engine=None):
+    host = _normalize_target(url_or_domain)
         
     try:
-        r = requests.get(host, timeout=timeout, allow_redirects=True)
-        missing = [h for h in SECURITY_HEADERS if h not in r.headers]
-        return missing
+        with session_scope(session, timeout=timeout) as http, engine_scope(engine) as eng:
+            r = await eng.run(http.fetch, host, timeout=timeout, allow_redirects=True)
+        return HeadersResult(missing=[h for h in SECURITY_HEADERS if h not in r.headers])
     except Exception as e:
-        return {'error': str(e)}
+        return HeadersResult(error=str(e))
 
 
-def find_admin_pages(url_or_domain, timeout=3):
+def find_admin_pages(url_or_domain, timeout=3, session=None, engine=None, wordlist=None,
+                     prune=None):
     """
     Discover common administrative interfaces that may be
-    exposed and require proper access controls
+    exposed and require proper access controls.
+    `wordlist` (a file path or an iterable of paths) replaces COMMON_ADMIN_PATHS.
+    Returns an AdminResult: `found` paths plus the discovery counters.
     """
-    host = url_or_domain
-    if not host.startswith('http'):
-        host = 'http://' + host
-        
-    found = []
-    for path in COMMON_ADMIN_PATHS:
-        try:
-            url = urljoin(host, path)
-            r = requests.get(url, timeout=timeout, allow_redirects=False)
-            
-            # Consider various success indicators
-            if r.status_code in [200, 302, 301]:
-                found.append(path)
-                
-        except requests.exceptions.RequestException:
-            # Continue checking other paths even if one fails
-            continue
-            
-    return found
+    return run_sync(find_admin_pages_async(url_or_domain, timeout, session, engine, wordlist,
+                                           prune))
 
 
-def quick_xss_reflection_test(url_or_domain, timeout=5):
+async def find_admin_pages_async(url_or_domain, timeout=3, session=None, engine=None,
+                                 wordlist=None, prune=None):
+    """
+    Paths are probed concurrently and results keep list order. Pages that
+    match the host's soft-404 page are ignored. Directory pruning (see
+    core.discovery) is on by default only for a custom wordlist.
+    """
+    host = _normalize_target(url_or_domain)
+    if prune is None:
+        prune = wordlist is not None
+
+    with session_scope(session, timeout=timeout) as http, engine_scope(engine) as eng:
+        result = await discover_paths_async(host, wordlist or COMMON_ADMIN_PATHS, http, eng,
+                                            timeout=timeout, prune=prune)
+    return AdminResult(**result)
+
+
+def quick_xss_reflection_test(url_or_domain, timeout=5, session=None, engine=None,
+                              max_bytes=XSS_MAX_BYTES):
     """
     Basic reflected XSS test using a simple payload.
     This is a minimal test - comprehensive XSS testing requires more sophisticated approaches.
+    Returns an XssResult whose `params` are the reflected parameter names.
     """
-    host = url_or_domain
-    if not host.startswith('http'):
-        host = 'http://' + host
-        
-    # Simple test payload that's unlikely to cause harm
-    payload = "<s1>moriarty_test</s1>"
+    return run_sync(quick_xss_reflection_test_async(url_or_domain, timeout, session, engine,
+                                                    max_bytes))
+
+
+async def quick_xss_reflection_test_async(url_or_domain, timeout=5, session=None, engine=None,
+                                          max_bytes=XSS_MAX_BYTES):
+    """
+    Parameters are probed concurrently. Each response is streamed and
+    searched as bytes, stopping at the payload or after max_bytes.
+    """
+    host = _normalize_target(url_or_domain)
+
+    def probe(param):
+        """True/False, or the exception if the request got no answer"""
+        try:
+            r = http.request('GET', host, params={param: XSS_PAYLOAD}, timeout=timeout,
+                             stream=True)
+        except requests.exceptions.RequestException as e:
+            return e
+        try:
+            return _body_contains(r, XSS_PAYLOAD, max_bytes)
+        except requests.exceptions.RequestException:
+            return False
+        finally:
+            # Drops the connection if the body was not read to the end
+            http.release(r)
     
     try:
-        # Test with common parameter names
-        test_params = ['q', 'search', 'query', 'input', 'test']
-        
-        for param in test_params:
-            try:
-                r = requests.get(host, params={param: payload}, timeout=timeout)
-                if payload in r.text:
-                    return True
-            except requests.exceptions.RequestException:
-                continue
+        with session_scope(session, timeout=timeout) as http, engine_scope(engine) as eng:
+            # Test with common parameter names
+            hits = await asyncio.gather(*(eng.run(probe, p) for p in XSS_TEST_PARAMS))
+        if all(isinstance(hit, Exception) for hit in hits):
+            # Nothing answered: an unreachable host is not a clean result
+            return XssResult(params=[], error=str(hits[0]))
+        return XssResult(params=[param for param, hit in zip(XSS_TEST_PARAMS, hits)
+                                 if hit is True])
                 
-    except Exception:
-        pass
-        
+    except Exception as e:
+        return XssResult(params=[], error=str(e))
+
+
+def _body_contains(r, text, max_bytes, chunk_size=XSS_CHUNK_SIZE):
+    """
+    Stream a response body looking for `text`, keeping only a small overlap
+    between chunks. Bytes are searched directly for ASCII-compatible
+    charsets; other charsets (UTF-16/32) fall back to decoding the capped body.
+    """
+    charset = (requests.utils.get_encoding_from_headers(r.headers) or 'utf-8').lower()
+    if charset.replace('-', '').startswith(('utf16', 'utf32')):
+        body = b''
+        for chunk in r.iter_content(chunk_size):
+            body += chunk
+            if len(body) >= max_bytes:
+                break
+        return text in body[:max_bytes].decode(charset, errors='replace')
+
+    marker = text.encode('utf-8')
+    overlap = len(marker) - 1
+    tail = b''
+    read = 0
+    for chunk in r.iter_content(chunk_size):
+        window = tail + chunk
+        if marker in window:
+            return True
+        read += len(chunk)
+        if read >= max_bytes:
+            return False
+        tail = window[-overlap:]
     return False
 
 
-def port_scan_common(host, timeout=2):
+def port_scan_common(host, timeout=2, engine=None, resolver=None, ports=None, metrics=None,
+                     latency=None):
     """
-    Basic port scanning for common services.
+    Basic port scanning for common services (or the given `ports`, a list
+    or a spec like 'web,8000-8100', see core.portscan.parse_ports).
     Limited to avoid being too aggressive or triggering security systems.
+    Returns a PortsResult with the `open` ports of the first resolved address.
+    """
+    return run_sync(port_scan_common_async(host, timeout, engine, resolver, ports, metrics,
+                                           latency))
+
+
+async def port_scan_common_async(host, timeout=2, engine=None, resolver=None, ports=None,
+                                 metrics=None, latency=None):
+    """
+    Resolve once (cached, IPv4 or IPv6), then run every connect from one
+    non-blocking PortScanner loop. The scanner's sockets are reserved from
+    the engine's concurrency slots first, so other checks and the port scan
+    together never have more than the engine's limit in flight. Each probe
+    is reported to `metrics` as open, closed, filtered or skipped.
+
+    Connect times feed a LatencyTracker, so probes that start later wait a
+    multiple of the observed RTT rather than the full `timeout`, and once
+    PORT_FAILURES_TO_SKIP probes in a row got no answer at all the
+    remaining ports are skipped.
     """
-    import socket
-    
     if host.startswith('http'):
-        from urllib.parse import urlparse
-        parsed = urlparse(host)
-        host = parsed.netloc
-    
-    # Common ports to check
-    common_ports = [21, 22, 23, 25, 53, 80, 110, 143, 443, 993, 995]
-    open_ports = []
+        host = urlparse(host).hostname
     
-    for port in common_ports:
-        try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(timeout)
-            result = sock.connect_ex((host, port))
-            if result == 0:
-                open_ports.append(port)
-            sock.close()
-        except Exception:
-            continue
-            
-    return open_ports
+    ip = await (resolver or default_resolver).first_address_async(host)
+    if ip is None:
+        return PortsResult(open=[], error=f'Could not resolve {host}')
+    if latency is None:
+        latency = LatencyTracker(floor=PORT_TIMEOUT_FLOOR, failures_to_skip=PORT_FAILURES_TO_SKIP)
+
+    ports = parse_ports(ports)
+    with engine_scope(engine) as eng:
+        async with eng.reserve(len(ports)) as slots:
+            scanner = PortScanner(timeout, concurrency=slots, per_host=slots,
+                                  latency=latency, metrics=metrics)
+            probes = await eng.run_reserved(lambda: list(scanner.scan([(host, ip)], ports)))
+
+    found = {probe.port for probe in probes if probe.state == 'open'}
+    return PortsResult(address=ip, open=[port for port in ports if port in found])
@@ -0,0 +1,247 @@
+# Scan-scoped HTTP client shared by every core check
+# One ScanSession per scan keeps connections to the target alive between probes
+import time
+from contextlib import contextmanager
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+from urllib3.util.retry import Retry
+
+from core.cache import CachedResponse, ResponseCache, cache_key
+from core.latency import LatencyTracker, host_key
+
+DEFAULT_USER_AGENT = 'CyberMoriarty-Lite/0.1'
+
+# Unread body bytes release() will still read to keep a connection reusable
+DRAIN_LIMIT = 64 * 1024
+
+
+class HostUnreachable(requests.exceptions.ConnectionError):
+    """Raised without touching the network for a host that never answered this scan"""
+
+
+class ScanSession:
+    """
+    Connection-pooled HTTP client for a single scan.
+
+    - keep-alive pooling so repeated probes reuse the same TCP/TLS connection
+    - per-host connection limit (pool_maxsize, blocking when exhausted)
+    - configurable retries with backoff and a default timeout
+    - fetch-once response cache shared by the checks (cache=False to disable)
+    - optional core.metrics.ScanMetrics counting requests, bytes, retries and timeouts
+    - adaptive timeouts from observed per-host latency (core.latency); a host
+      whose first request could not connect is skipped from then on
+
+    Responses from request() should be handed back with release() so the
+    bytes actually read are counted.
+    """
+
+    def __init__(self, timeout=5, retries=0, backoff_factor=0.3,
+                 pool_connections=10, pool_maxsize=10,
+                 user_agent=DEFAULT_USER_AGENT, cache=True, metrics=None,
+                 adaptive_timeouts=True):
+        self.timeout = timeout
+        self.metrics = metrics
+        self.latency = LatencyTracker() if adaptive_timeouts else None
+        self.cache = ResponseCache() if cache else None
+        self.http = requests.Session()
+        self.http.headers['User-Agent'] = user_agent
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=0,
+            backoff_factor=backoff_factor,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=True,
+            max_retries=retry,
+        )
+        self.http.mount('http://', adapter)
+        self.http.mount('https://', adapter)
+
+    def request(self, method, url, timeout=None, **kwargs):
+        """
+        Send a request through the shared pool. `timeout` (or the session
+        default) is the ceiling; with adaptive timeouts a host that answers
+        quickly gets a shorter one.
+        """
+        if timeout is None:
+            timeout = self.timeout
+        if self.latency is None:
+            return self._send(method, url, timeout, **kwargs)
+
+        key = host_key(url)
+        pilot = self.latency.admit(key)
+        try:
+            if self.latency.unreachable(key):
+                if self.metrics is not None:
+                    self.metrics.record_error(method, url, 'skipped', 0.0)
+                raise HostUnreachable(f'{key} did not answer earlier probes; skipped')
+            try:
+                r = self._send(method, url, self.latency.timeout(key, timeout), **kwargs)
+            except requests.exceptions.ConnectionError as e:
+                if _connect_failed(e, key):
+                    self.latency.failed(key)
+                raise
+            self.latency.observe(key, r.elapsed.total_seconds())
+            return r
+        finally:
+            if pilot:
+                self.latency.release(key)
+
+    def _send(self, method, url, timeout, **kwargs):
+        if self.metrics is None:
+            return self.http.request(method, url, timeout=timeout, **kwargs)
+
+        start = time.perf_counter()
+        try:
+            return self.http.request(method, url, timeout=timeout, **kwargs)
+        except requests.exceptions.RequestException as e:
+            kind = 'timeout' if isinstance(e, requests.exceptions.Timeout) else 'error'
+            self.metrics.record_error(method, url, kind, time.perf_counter() - start)
+            raise
+
+    def release(self, r, drain=True):
+        """
+        Close a response from request(), recording it (and its redirect hops)
+        in metrics. A small unread rest of the body is drained first so the
+        keep-alive connection goes back to the pool instead of being dropped;
+        drain=False drops the connection instead, so no body byte is read.
+        """
+        length = r.headers.get('Content-Length')
+        if drain and not r._content_consumed and length and length.isdigit():
+            raw = r.raw
+            if hasattr(raw, 'tell') and int(length) - raw.tell() <= DRAIN_LIMIT:
+                try:
+                    for _ in r.iter_content(DRAIN_LIMIT):
+                        pass
+                except requests.exceptions.RequestException:
+                    pass
+        if self.metrics is not None:
+            for hop in r.history + [r]:
+                raw = hop.raw
+                nbytes = raw.tell() if hasattr(raw, 'tell') else len(hop._content or b'')
+                retries = len(getattr(getattr(raw, 'retries', None), 'history', ()) or ())
+                self.metrics.record_request(hop.request.method, hop.url, hop.status_code,
+                                            nbytes, hop.elapsed.total_seconds(), retries)
+        r.close()
+
+    def get(self, url, timeout=None, **kwargs):
+        return self.request('GET', url, timeout=timeout, **kwargs)
+
+    def fetch(self, url, params=None, method='GET', allow_redirects=True,
+              keep_body=False, timeout=None):
+        """
+        Return a CachedResponse for the request, hitting the network only
+        the first time a (method, normalized URL, params) combination is seen.
+        Errors are replayed from the cache as well.
+        """
+        if self.cache is None:
+            return self._fetch(url, params, method, allow_redirects, keep_body, timeout)
+
+        key = cache_key(method, url, params, allow_redirects)
+        with self.cache.key_lock(key):
+            entry = self.cache.get(key, need_body=keep_body)
+            if entry is None:
+                try:
+                    entry = self._fetch(url, params, method, allow_redirects, keep_body, timeout)
+                except requests.exceptions.RequestException as e:
+                    entry = e
+                self.cache.put(key, entry)
+
+        if isinstance(entry, Exception):
+            raise entry
+        return entry
+
+    def cached(self, url, params=None, method='GET', allow_redirects=True):
+        """The cached response for a request, or None if it was not fetched (or failed)"""
+        if self.cache is None:
+            return None
+        entry = self.cache.get(cache_key(method, url, params, allow_redirects))
+        return entry if isinstance(entry, CachedResponse) else None
+
+    def revalidate(self, url, etag=None, last_modified=None, timeout=None):
+        """
+        Conditional GET of a page seen in an earlier scan. Returns True on
+        304 Not Modified; otherwise the fresh response is cached exactly as
+        fetch() would have, and False is returned.
+        """
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        if not headers:
+            return False
+
+        try:
+            r = self.request('GET', url, headers=headers, timeout=timeout, allow_redirects=True)
+        except requests.exceptions.RequestException:
+            return False
+        if r.status_code == 304:
+            self.release(r)
+            return True
+
+        entry = CachedResponse.from_response(r)
+        self.release(r)
+        if self.cache is not None:
+            self.cache.put(cache_key('GET', url), entry)
+        return False
+
+    def _fetch(self, url, params, method, allow_redirects, keep_body, timeout):
+        r = self.request(method, url, params=params, timeout=timeout,
+                         allow_redirects=allow_redirects)
+        entry = CachedResponse.from_response(r, keep_body=keep_body)
+        self.release(r)
+        return entry
+
+    def close(self):
+        self.http.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _connect_failed(e, key):
+    """
+    True if `e` means nothing answered at `key` (host:port): a connect
+    timeout or refused/unroutable connect on that very address. TLS errors,
+    dropped connections and failures on a redirect hop elsewhere do not count.
+    """
+    failed_url = getattr(e.request, 'url', None)
+    if failed_url is not None and host_key(failed_url) != key:
+        return False
+    if isinstance(e, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(e, requests.exceptions.SSLError):
+        return False
+    cause = e.args[0] if e.args else None
+    if isinstance(cause, MaxRetryError):
+        cause = cause.reason
+    return isinstance(cause, NewConnectionError)
+
+
+@contextmanager
+def session_scope(session=None, **options):
+    """
+    Yield the caller's session, or a temporary one that is closed afterwards.
+    Lets every check accept an optional session without leaking pools.
+    """
+    if session is not None:
+        yield session
+        return
+
+    session = ScanSession(**options)
+    try:
+        yield session
+    finally:
+        session.close()
@@ -0,0 +1,116 @@
+# Persistent SQLite store of per-target, per-check results
+# Lets rescans skip checks whose last result is still fresh
+import json
+import sqlite3
+import threading
+import time
+
+from core.recon import target_key
+
+# Default freshness window per check, in seconds
+DEFAULT_MAX_AGE = {
+    'recon': 6 * 3600,
+    'headers': 24 * 3600,
+    'admin': 24 * 3600,
+    'xss': 24 * 3600,
+    'ports': 6 * 3600,
+}
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS results (
+    target        TEXT NOT NULL,
+    check_name    TEXT NOT NULL,
+    result        TEXT NOT NULL,
+    scanned_at    REAL NOT NULL,
+    etag          TEXT,
+    last_modified TEXT,
+    page_url      TEXT,
+    PRIMARY KEY (target, check_name)
+)
+'''
+
+# Columns added after the first release, created on open in older files
+ADDED_COLUMNS = {'page_url': 'TEXT'}
+
+
+class ResultStore:
+    """
+    Latest result of every check for every target, with the root page's
+    URL (the scheme that answered) and its ETag/Last-Modified so a stale
+    entry can be revalidated cheaply.
+    Targets are keyed by host (see core.recon.target_key).
+    """
+
+    def __init__(self, path='cybermoriarty.db'):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(SCHEMA)
+        columns = {row[1] for row in self._db.execute('PRAGMA table_info(results)')}
+        for name, kind in ADDED_COLUMNS.items():
+            if name not in columns:
+                self._db.execute(f'ALTER TABLE results ADD COLUMN {name} {kind}')
+        self._db.commit()
+
+    def get(self, target, check):
+        return self.get_all(target).get(check)
+
+    def get_all(self, target):
+        """{check: {'result', 'scanned_at', 'etag', 'last_modified', 'page_url'}} for one target"""
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT check_name, result, scanned_at, etag, last_modified, page_url '
+                'FROM results WHERE target = ?', (target_key(target),)).fetchall()
+        return {
+            name: {
+                'result': json.loads(result),
+                'scanned_at': scanned_at,
+                'etag': etag,
+                'last_modified': last_modified,
+                'page_url': page_url,
+            }
+            for name, result, scanned_at, etag, last_modified, page_url in rows
+        }
+
+    def put(self, target, check, result, etag=None, last_modified=None, scanned_at=None,
+            page_url=None):
+        """`page_url` is the root page the validators belong to"""
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO results '
+                '(target, check_name, result, scanned_at, etag, last_modified, page_url) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (target_key(target), check, json.dumps(result, default=str),
+                 scanned_at or time.time(), etag, last_modified, page_url))
+            self._db.commit()
+
+    def touch(self, target, check, scanned_at=None):
+        """Mark a stored result as confirmed current (e.g. after a 304)"""
+        with self._lock:
+            self._db.execute(
+                'UPDATE results SET scanned_at = ? WHERE target = ? AND check_name = ?',
+                (scanned_at or time.time(), target_key(target), check))
+            self._db.commit()
+
+    def fresh(self, target, max_age=None, now=None):
+        """Split stored rows into (fresh results, stale rows) by per-check max age"""
+        max_age = {**DEFAULT_MAX_AGE, **(max_age or {})}
+        now = now or time.time()
+        fresh, stale = {}, {}
+        for name, row in self.get_all(target).items():
+            if now - row['scanned_at'] <= max_age.get(name, 0):
+                fresh[name] = row['result']
+            else:
+                stale[name] = row
+        return fresh, stale
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,218 @@
+"""
+CyberMoriarty Lite - Background scan jobs for the web interface
+Scans run on a bounded worker pool; clients poll or stream progress by job id.
+Identical requests share one job while it runs and, for a short time, after.
+"""
+
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class QueueFull(Exception):
+    """Raised when too many jobs are already waiting for a worker"""
+
+
+class ScanJob:
+    """One queued/running/finished scan plus its progress events"""
+
+    def __init__(self, url, options=None):
+        self.id = uuid.uuid4().hex
+        self.url = url
+        self.options = options or {}
+        self.status = 'queued'
+        self.created = time.time()
+        self.finished = None
+        self.checks = {}
+        self.result = None
+        self.error = None
+        self.events = []
+        self.key = None
+        self.submitters = 1
+        self._closed = False
+        self._cond = threading.Condition()
+
+    @property
+    def done(self):
+        return self.status in ('completed', 'failed')
+
+    def record_check(self, name, seconds, data):
+        """Store a finished check's result and announce it"""
+        with self._cond:
+            self.checks[name] = data
+        self.add_event('check', {'check': name, 'seconds': seconds, 'result': data})
+
+    def add_event(self, event, data):
+        with self._cond:
+            self.events.append((event, data))
+            if event == 'done':
+                self._closed = True
+            self._cond.notify_all()
+
+    def iter_events(self, start=0, keepalive=15):
+        """
+        Yield (event, data) from index `start` on, blocking for new ones
+        until the job is done. Yields None after `keepalive` idle seconds.
+        """
+        index = start
+        while True:
+            with self._cond:
+                if index >= len(self.events) and not self._closed:
+                    self._cond.wait(keepalive)
+                pending = self.events[index:]
+                finished = self._closed
+            if not pending and not finished:
+                yield None
+            for item in pending:
+                yield item
+            index += len(pending)
+            if finished and index >= len(self.events):
+                return
+
+    def to_dict(self):
+        # The worker thread adds checks while a request serializes the job
+        with self._cond:
+            checks = dict(self.checks)
+        return {
+            'job_id': self.id,
+            'url': self.url,
+            'options': self.options,
+            'status': self.status,
+            'submitters': self.submitters,
+            'created': self.created,
+            'finished': self.finished,
+            'checks': checks,
+            'result': self.result,
+            'error': self.error,
+        }
+
+
+class JobManager:
+    """
+    Bounded pool of scan workers.
+
+    runner(url, on_check, **options) performs the scan and returns the final
+    result; on_check(name, result, seconds) is wired to the job's progress events.
+    At most `max_pending` jobs may wait for a worker and the newest
+    `keep` jobs are remembered for status lookups.
+
+    With a `key(url, options)` function, submitting a request whose key
+    matches a queued or running job returns that job instead of starting
+    another (coalescing), and completed jobs are reused for `ttl` seconds
+    from an LRU of `cache_size` entries. invalidate() drops cached ones.
+    """
+
+    def __init__(self, runner, max_workers=4, max_pending=32, keep=200, key=None,
+                 ttl=0, cache_size=128):
+        self.runner = runner
+        self.max_pending = max_pending
+        self.keep = keep
+        self.key = key
+        self.ttl = ttl
+        self.cache_size = cache_size
+        self._pool = ThreadPoolExecutor(max_workers=max_workers,
+                                        thread_name_prefix='moriarty-job')
+        self._jobs = OrderedDict()
+        self._in_flight = {}
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, url, refresh=False, **options):
+        """
+        Queue a scan, or return the job already answering the same request.
+        refresh=True skips the result cache (a running job is still shared).
+        """
+        key = self.key(url, options) if self.key else None
+        with self._lock:
+            job = self._shared_job(key, refresh)
+            if job is not None:
+                job.submitters += 1
+                self._jobs[job.id] = job
+                self._jobs.move_to_end(job.id)
+                return job
+            pending = sum(1 for j in self._jobs.values() if j.status == 'queued')
+            if pending >= self.max_pending:
+                raise QueueFull('Too many scans waiting, try again later')
+            job = ScanJob(url, options)
+            job.key = key
+            self._jobs[job.id] = job
+            if key is not None:
+                self._in_flight[key] = job
+            self._evict()
+        job.add_event('queued', {'job_id': job.id, 'url': url})
+        self._pool.submit(self._run, job)
+        return job
+
+    def _shared_job(self, key, refresh):
+        if key is None:
+            return None
+        job = self._in_flight.get(key)
+        if job is not None:
+            return job
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        job, expires = entry
+        if refresh or time.time() >= expires:
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return job
+
+    def invalidate(self, match=None):
+        """
+        Drop cached results: all of them, or those whose key satisfies
+        match(key). Running jobs are not affected. Returns how many went.
+        """
+        with self._lock:
+            keys = [k for k in self._cache if match is None or match(k)]
+            for key in keys:
+                del self._cache[key]
+        return len(keys)
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def counts(self):
+        """Number of remembered jobs per status"""
+        with self._lock:
+            return Counter(job.status for job in self._jobs.values())
+
+    def _evict(self):
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.keep:
+                break
+            if self._jobs[job_id].done:
+                del self._jobs[job_id]
+
+    def _run(self, job):
+        job.status = 'running'
+        job.add_event('running', {'job_id': job.id})
+
+        def on_check(name, result, seconds):
+            job.record_check(name, seconds, result.to_dict())
+
+        try:
+            result = self.runner(job.url, on_check, **job.options)
+            status, error = 'completed', None
+        except Exception as e:
+            result, status, error = None, 'failed', f'Scan error: {e}'
+        with self._lock:
+            # Finish and hand the key over to the cache atomically, so no
+            # submitter sees the job neither running nor cached
+            job.result, job.status, job.error = result, status, error
+            job.finished = time.time()
+            if job.key is not None:
+                self._in_flight.pop(job.key, None)
+                if status == 'completed' and self.ttl > 0:
+                    self._cache[job.key] = (job, job.finished + self.ttl)
+                    self._cache.move_to_end(job.key)
+                    while len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+        job.add_event('done', {'job_id': job.id, 'status': job.status, 'error': job.error})
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -1,59 +1,74 @@
 from kivy.app import App
-from kivy.lang import Builder
 from kivy.metrics import dp
 from kivy.clock import mainthread
 from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.button import Button
 from kivy.uix.label import Label
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.textinput import TextInput
+
+import time
+
+# The scanner stack (requests, asyncio, core.*) is imported by the first
+# scan, not before the first frame
+
+SCANNING = '🔎 Nagsi-scan na si Moriarty...'
+
+
+class OutputRow(Label):
+    """One block of output text; wraps to the list's width and grows to fit"""
+
+    def __init__(self, **kwargs):
+        super().__init__(halign='left', valign='top', size_hint_y=None, **kwargs)
+        self.bind(width=self._wrap, texture_size=self._fit)
+
+    def _wrap(self, *_):
+        self.text_size = (self.width, None)
+
+    def _fit(self, *_):
+        self.height = self.texture_size[1] + dp(12)
 
-from core.recon import recon
-from core.scanner import check_security_headers, find_admin_pages, quick_xss_reflection_test
-from assistant import detect_intent, explain_recon, explain_scan_results
-
-import threading
-
-# Kivy language for layout (keeps design simple, mobile friendly)
-kv = '''
-<ScannerLayout>:
-    orientation: 'vertical'
-    padding: dp(12)
-    spacing: dp(10)
-
-    TextInput:
-        id: url_input
-        hint_text: 'Ilagay ang website (e.g. example.com)'
-        size_hint_y: None
-        height: dp(48)
-
-    Button:
-        text: 'Scan (Sari-Sari Mode)'
-        size_hint_y: None
-        height: dp(48)
-        on_press: app.run_full_check()
-
-    ScrollView:
-        do_scroll_x: False
-        do_scroll_y: True
-        GridLayout:
-            id: output_grid
-            cols: 1
-            size_hint_y: None
-            height: self.minimum_height
-
-    Button:
-        text: 'Switch to Pro Mode'
-        size_hint_y: None
-        height: dp(40)
-        on_press: app.switch_mode()
-'''
 
 class ScannerLayout(BoxLayout):
-    pass
+    """
+    Main screen, built directly in Python rather than from a KV string so
+    startup skips loading and parsing KV rules (mobile friendly, same
+    layout as before). Widgets are reachable through self.ids.
+
+    Output is a RecycleView: rows are plain dicts in `output.data` and only
+    the visible ones get (reused) widgets.
+    """
+
+    def __init__(self, app, **kwargs):
+        super().__init__(orientation='vertical', padding=dp(12), spacing=dp(10), **kwargs)
+        url_input = TextInput(hint_text='Ilagay ang website (e.g. example.com)',
+                              size_hint_y=None, height=dp(48))
+        scan_button = Button(text='Scan (Sari-Sari Mode)', size_hint_y=None, height=dp(48))
+        scan_button.bind(on_press=lambda *_: app.run_full_check())
+
+        rows = RecycleBoxLayout(orientation='vertical', size_hint_y=None, spacing=dp(6),
+                                default_size=(None, dp(48)), default_size_hint=(1, None))
+        rows.bind(minimum_height=rows.setter('height'))
+        output = RecycleView(viewclass=OutputRow, do_scroll_x=False)
+        output.add_widget(rows)
+
+        mode_button = Button(text='Switch to Pro Mode', size_hint_y=None, height=dp(40))
+        mode_button.bind(on_press=lambda *_: app.switch_mode())
+
+        for widget in (url_input, scan_button, output, mode_button):
+            self.add_widget(widget)
+        self.ids = {'url_input': url_input, 'output': output}
 
 class CyberMoriartyApp(App):
     def build(self):
         self.mode = 'sari-sari'  # or 'pro'
-        Builder.load_string(kv)
-        return ScannerLayout()
+        # The running scan (a core.engine.BackgroundRun) and its URL; every
+        # new scan bumps the generation so late results of an older one are dropped
+        self._scan = None
+        self._scan_url = None
+        self._generation = 0
+        return ScannerLayout(self)
 
     def switch_mode(self):
         self.mode = 'pro' if self.mode == 'sari-sari' else 'sari-sari'
@@ -71,46 +86,64 @@ class CyberMoriartyApp(App):
             self.show_output('❗ Please enter website/domain')
             return
 
-        # run in background thread to avoid freezing UI
-        t = threading.Thread(target=self._background_check, args=(url,))
-        t.daemon = True  # Allow app to exit even if thread is running
-        t.start()
-
-    def _background_check(self, url):
-        self.show_output('🔎 Nagsi-scan na si Moriarty...')
-        
-        # Run reconnaissance
-        r = recon(url)
-        
-        # Run security checks
-        missing = check_security_headers(url)
-        admins = find_admin_pages(url)
-        xss = quick_xss_reflection_test(url)
-
-        # Generate explanations
-        recon_text = explain_recon(r)
-        scan_text = explain_scan_results(missing, admins, xss)
-
-        final = recon_text + '\n\n' + scan_text
-        self.show_output(final)
+        # Extra taps on the same URL keep the running scan; a new URL replaces it
+        if self._scan is not None and self._scan.running:
+            if url == self._scan_url:
+                return
+            self._scan.cancel()
+
+        from core.engine import BackgroundRun
+        from core.pipeline import scan_target_async
+
+        self._generation += 1
+        generation = self._generation
+        started = time.monotonic()
+        self.show_output(SCANNING)
+
+        def on_check(name, result, seconds):
+            self._add_check(generation, name, result)
+
+        def on_done(record, error, cancelled):
+            self._scan_finished(generation, url, error, cancelled, time.monotonic() - started)
+
+        # The scan runs on its own event loop in a background thread, so the
+        # UI never freezes and the scan can be cancelled
+        self._scan_url = url
+        self._scan = BackgroundRun(scan_target_async(url, on_check=on_check), on_done)
+
+    def on_stop(self):
+        if self._scan is not None:
+            self._scan.cancel()
+
+    @mainthread
+    def _add_check(self, generation, name, result):
+        if generation != self._generation:
+            return
+        from assistant import explain_check
+        text = explain_check(name, result)
+        if text:
+            self._rows().append({'text': text})
+
+    @mainthread
+    def _scan_finished(self, generation, url, error, cancelled, seconds):
+        if generation != self._generation or cancelled:
+            return
+        rows = self._rows()
+        if error is not None:
+            rows[0] = {'text': f'❌ Error during scan: {error}'}
+            return
+        from assistant import ACTION_STEPS
+        rows[0] = {'text': f'✅ Tapos na ang scan ng {url} ({seconds:.1f}s)'}
+        rows.append({'text': ACTION_STEPS.strip()})
+
+    def _rows(self):
+        return self.root.ids.output.data
 
     @mainthread
     def show_output(self, text):
-        if self.root and hasattr(self.root, 'ids') and hasattr(self.root.ids, 'output_grid'):
-            grid = self.root.ids.output_grid
-            grid.clear_widgets()
-            
-            lbl = Label(
-                text=text, 
-                size_hint_y=None, 
-                text_size=(None, None),
-                halign='left',
-                valign='top'
-            )
-            # Set initial height based on text content
-            lbl.height = dp(200)
-            
-            grid.add_widget(lbl)
+        if self.root and hasattr(self.root, 'ids') and hasattr(self.root.ids, 'output'):
+            # Replacing the data reuses the row widgets instead of rebuilding them
+            self.root.ids.output.data = [{'text': text}]
         else:
             print(f"Output: {text}")
 
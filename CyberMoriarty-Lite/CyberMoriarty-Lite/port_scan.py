@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+CyberMoriarty Lite - Port Audit
+TCP connect scan of many hosts, CIDR ranges included, for checking the
+exposure of your own servers. Results stream out as each port settles.
+"""
+
+import argparse
+import sys
+import time
+from collections import Counter
+
+from core.output import JsonlWriter
+from core.portscan import (
+    MAX_CIDR_ADDRESSES,
+    PORT_SETS,
+    PortScanner,
+    expand_targets,
+    parse_network,
+    parse_ports,
+    raise_fd_limit,
+)
+
+
+def read_items(values):
+    """Targets from the command line; '-' reads stdin and '@FILE' reads a file"""
+    for value in values:
+        if value == '-':
+            yield from (line.strip() for line in sys.stdin)
+        elif value.startswith('@'):
+            with open(value[1:], encoding='utf-8') as fh:
+                yield from (line.strip() for line in fh)
+        else:
+            yield value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Scan TCP ports of many hosts')
+    parser.add_argument('targets', nargs='+',
+                        help="hosts, IPs or CIDR ranges (IPv4/IPv6); '@FILE' reads one per line, "
+                             "'-' reads stdin")
+    parser.add_argument('-p', '--ports', default='common',
+                        help=f"ports, ranges and sets, e.g. 'web,22,8000-8100' "
+                             f"(sets: {', '.join(PORT_SETS)}; default: common)")
+    parser.add_argument('--timeout', type=float, default=2.0,
+                        help='longest wait for an answer per connect in seconds (default: 2)')
+    parser.add_argument('--concurrency', type=int, default=2000,
+                        help='connects in flight in total (default: 2000)')
+    parser.add_argument('--per-host', type=int, default=64,
+                        help='connects in flight per address (default: 64)')
+    parser.add_argument('--max-addresses', type=int, default=MAX_CIDR_ADDRESSES,
+                        help=f'largest CIDR block accepted, in addresses '
+                             f'(default: {MAX_CIDR_ADDRESSES})')
+    parser.add_argument('--all', action='store_true',
+                        help='also show closed, filtered and skipped ports')
+    parser.add_argument('-o', '--output',
+                        help="write every probe as a JSON line to this file ('-' for stdout)")
+    parser.add_argument('--quiet', action='store_true', help='no summary on stderr')
+    args = parser.parse_args(argv)
+
+    try:
+        ports = parse_ports(args.ports)
+    except ValueError as e:
+        parser.error(str(e))
+
+    # Blocks given on the command line are checked before anything is sent;
+    # those from a file or stdin when they are reached
+    for item in args.targets:
+        if item != '-' and not item.startswith('@'):
+            try:
+                parse_network(item, args.max_addresses)
+            except ValueError as e:
+                parser.error(str(e))
+
+    hosts = 0
+
+    def counted(targets):
+        nonlocal hosts
+        for target in targets:
+            hosts += 1
+            yield target
+
+    targets = counted(expand_targets(read_items(args.targets), max_addresses=args.max_addresses))
+    raise_fd_limit(args.concurrency + 256)
+    scanner = PortScanner(args.timeout, concurrency=args.concurrency, per_host=args.per_host)
+    writer = JsonlWriter(args.output) if args.output else None
+    states = Counter()
+    started = time.monotonic()
+
+    try:
+        for probe in scanner.scan(targets, ports):
+            states[probe.state] += 1
+            if writer:
+                writer.write(probe.to_dict())
+            elif args.all or probe.state == 'open':
+                reason = f'\t{probe.error}' if probe.error else ''
+                print(f'{probe.host}\t{probe.address or "-"}\t{probe.port}\t{probe.state}{reason}',
+                      flush=True)
+    except ValueError as e:
+        # A block over --max-addresses in a target file
+        print(f'{parser.prog}: error: {e}', file=sys.stderr)
+        return 2
+    except KeyboardInterrupt:
+        print('\nPort scan stopped.', file=sys.stderr)
+        return 130
+    finally:
+        if writer:
+            writer.close()
+
+    if not hosts:
+        parser.error('no targets')
+    if not args.quiet:
+        summary = ', '.join(f'{state}={states[state]}'
+                            for state in ('open', 'closed', 'filtered', 'skipped'))
+        print(f'{hosts} hosts x {len(ports)} ports in {time.monotonic() - started:.1f}s: '
+              f'{summary}', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,9 +4,17 @@ CyberMoriarty Lite - Simple Console Version
 A command-line cybersecurity reconnaissance tool with Taglish assistant interface
 """
 
-from core.recon import recon
-from core.scanner import check_security_headers, find_admin_pages, quick_xss_reflection_test
-from assistant import detect_intent, explain_recon, explain_scan_results
+# The scanner stack (requests, asyncio, core.*) is imported by the first
+# scan, not at startup, so the prompt shows up right away
+
+# Progress line printed as each check finishes
+CHECK_LABELS = {
+    'recon': "📍 Basic info",
+    'headers': "🛡️ Security headers",
+    'admin': "🔍 Admin pages",
+    'xss': "⚠️ XSS test",
+    'ports': "🔌 Open ports",
+}
 
 def main():
     print("🔒 CyberMoriarty Lite - Cybersecurity Scanner")
@@ -34,11 +42,10 @@ def main():
             
             # Check if it's a scan command
             if user_input.lower().startswith(('scan ', 'check ', 'tingnan ')):
-                # Extract URL from command
-                parts = user_input.split(' ', 1)
+                # Extract URL (and optional check names) from command
+                parts = user_input.split()
                 if len(parts) > 1:
-                    url = parts[1].strip()
-                    run_scan(url)
+                    run_scan(parts[1], parts[2:])
                 else:
                     print("❗ Kulang ang URL. Example: scan google.com")
             else:
@@ -60,6 +67,7 @@ def show_help():
 
 Mga available commands:
 - scan [website] - Mag-scan ng website
+- scan [website] [checks...] - Piliin lang ang checks (recon, headers, admin, xss, ports)
 - help / tulong - Show this help
 - exit / quit - Close ang program
 
@@ -67,6 +75,7 @@ Mga examples:
 - scan google.com
 - scan https://example.com
 - tingnan facebook.com
+- scan example.com headers admin
 
 Mga features:
 ✓ DNS resolution at IP lookup
@@ -78,41 +87,40 @@ Mga features:
 Lahat ng results ay nasa Taglish para mas madaling maintindihan!
     """)
 
-def run_scan(url):
+def run_scan(url, checks=None):
+    from core.pipeline import scan_target
+    from assistant import explain_recon, explain_scan_results
+
     print(f"\n🔎 Nagsi-scan si Moriarty ng: {url}")
     print("-" * 40)
     
+    def progress(name, result, seconds):
+        print(f"{CHECK_LABELS.get(name, name)} ✓ ({seconds:.1f}s)")
+
     try:
-        # Run reconnaissance
-        print("📍 Gathering basic info...")
-        r = recon(url)
-        
-        # Run security checks
-        print("🛡️ Checking security headers...")
-        missing = check_security_headers(url)
-        
-        print("🔍 Looking for admin pages...")
-        admins = find_admin_pages(url)
-        
-        print("⚠️ Testing for XSS...")
-        xss = quick_xss_reflection_test(url)
+        # Independent checks run in parallel; each reports when done
+        scan = scan_target(url, on_check=progress, checks=checks)
 
         # Generate explanations
         print("\n" + "=" * 50)
         print("📊 SCAN RESULTS")
         print("=" * 50)
         
-        recon_text = explain_recon(r)
-        scan_text = explain_scan_results(missing, admins, xss)
-
-        print("\n🔍 RECONNAISSANCE:")
-        print(recon_text)
+        if scan.get('recon') is not None:
+            print("\n🔍 RECONNAISSANCE:")
+            print(explain_recon(scan.get('recon')))
         
         print("\n🛡️ SECURITY ANALYSIS:")
-        print(scan_text)
+        print(explain_scan_results(scan.get('headers'), scan.get('admin'), scan.get('xss')))
+
+        ports = scan.get('ports')
+        if ports is not None:
+            print(f"\n🔌 Open ports: {', '.join(map(str, ports.open)) or 'wala'}")
         
         print("\n" + "=" * 50)
         
+    except ValueError as e:
+        print(f"❗ {e}")
     except Exception as e:
         print(f"❌ Error during scan: {e}")
 
@@ -3,8 +3,7 @@
 Test script to demonstrate CyberMoriarty Lite functionality
 """
 
-from core.recon import recon
-from core.scanner import check_security_headers, find_admin_pages, quick_xss_reflection_test
+from core.pipeline import scan_target
 from assistant import detect_intent, explain_recon, explain_scan_results
 
 def test_scan(url):
@@ -12,27 +11,18 @@ def test_scan(url):
     print("=" * 60)
     
     try:
-        # Run reconnaissance
-        print("📍 Running reconnaissance...")
-        r = recon(url)
-        
-        # Run security checks
-        print("🛡️ Checking security headers...")
-        missing = check_security_headers(url)
-        
-        print("🔍 Looking for admin pages...")
-        admins = find_admin_pages(url)
-        
-        print("⚠️ Testing for XSS...")
-        xss = quick_xss_reflection_test(url)
+        # Run reconnaissance and security checks (in parallel)
+        print("📍 Running reconnaissance and security checks...")
+        scan = scan_target(url, on_check=lambda name, result, seconds:
+                           print(f"  ✓ {name} ({seconds:.2f}s)"))
 
         # Generate explanations
         print("\n" + "=" * 60)
         print("📊 SCAN RESULTS")
         print("=" * 60)
         
-        recon_text = explain_recon(r)
-        scan_text = explain_scan_results(missing, admins, xss)
+        recon_text = explain_recon(scan.get('recon'))
+        scan_text = explain_scan_results(scan.get('headers'), scan.get('admin'), scan.get('xss'))
 
         print("\n🔍 RECONNAISSANCE:")
         print(recon_text)
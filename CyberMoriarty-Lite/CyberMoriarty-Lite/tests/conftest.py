@@ -0,0 +1,19 @@
+# Shared fixtures for the unit tests
+# Run from the project directory: python -m pytest -q
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from mock_server import MockTarget  # noqa: E402
+
+
+@pytest.fixture
+def mock():
+    """A local MockTarget; no open/closed ports, tests that need them make their own"""
+    with MockTarget(open_ports=0, closed_ports=0) as target:
+        yield target
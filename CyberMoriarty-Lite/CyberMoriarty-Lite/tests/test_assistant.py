@@ -0,0 +1,36 @@
+from assistant import IntentMatcher, detect_intent, detect_intents
+
+
+def test_whole_words_only():
+    # 'hi' inside 'this'/'chip', 'scan' inside 'rescan' do not count
+    assert detect_intent('this chip') == 'unknown'
+    assert detect_intent('rescan') == 'unknown'
+    assert detect_intent('hi po') == 'greet'
+    assert detect_intent('Hello!') == 'greet'
+
+
+def test_word_suffixes_in_pattern():
+    assert detect_intent('scanning example.com') == 'scan'
+    assert detect_intent('pa-check naman') == 'scan'
+
+
+def test_multi_word_phrase():
+    assert detect_intent('how to secure my site') == 'howto'
+    assert detect_intent('howto') == 'unknown'
+
+
+def test_earlier_intent_wins_anywhere_in_message():
+    assert detect_intent('hi, pa-scan ng site ko') == 'scan'
+    assert detect_intent('salamat, paano ito?') == 'howto'
+
+
+def test_case_insensitive_and_batch():
+    assert detect_intents(['SALAMAT', 'KUMUSTA', 'wala']) == ['thanks', 'greet', 'unknown']
+
+
+def test_custom_intents():
+    matcher = IntentMatcher({'a': [r'foo'], 'b': [r'bar\w*']})
+    assert matcher.match('bars and foo') == 'a'
+    assert matcher.match('barista') == 'b'
+    assert matcher.match('food') == 'unknown'
+    assert matcher.match_many(['foo', 'bar']) == ['a', 'b']
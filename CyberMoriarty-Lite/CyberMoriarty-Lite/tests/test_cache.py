@@ -0,0 +1,55 @@
+import pytest
+import requests
+
+from core.cache import cache_key, normalize_url
+from core.session import ScanSession
+
+
+def test_normalize_url_case_and_default_ports():
+    assert normalize_url('HTTP://Example.COM') == 'http://example.com/'
+    assert normalize_url('http://example.com:80/a') == 'http://example.com/a'
+    assert normalize_url('https://example.com:443/') == 'https://example.com/'
+    assert normalize_url('https://example.com:80/') == 'https://example.com:80/'
+    assert normalize_url('http://example.com:8080') == 'http://example.com:8080/'
+
+
+def test_normalize_url_sorts_query_and_drops_fragment():
+    assert normalize_url('http://h/p?b=2&a=1&a=0#top') == 'http://h/p?a=0&a=1&b=2'
+    assert normalize_url('http://h/?empty=') == 'http://h/?empty='
+
+
+def test_normalize_url_keeps_path_case():
+    assert normalize_url('http://h/Admin') != normalize_url('http://h/admin')
+
+
+def test_cache_key_equivalent_requests_match():
+    assert cache_key('get', 'http://H:80') == cache_key('GET', 'http://h/')
+    assert (cache_key('GET', 'http://h/', {'b': 1, 'a': 2})
+            == cache_key('GET', 'http://h/', {'a': 2, 'b': 1}))
+
+
+def test_cache_key_distinguishes_method_params_and_redirects():
+    base = cache_key('GET', 'http://h/')
+    assert cache_key('HEAD', 'http://h/') != base
+    assert cache_key('GET', 'http://h/', {'q': 'x'}) != base
+    assert cache_key('GET', 'http://h/', allow_redirects=False) != base
+    assert cache_key('GET', 'https://h/') != base
+
+
+def test_session_fetches_equivalent_urls_once(mock):
+    with ScanSession() as session:
+        first = session.fetch(mock.url)
+        again = session.fetch(mock.url.upper().replace('HTTP://', 'http://') + '/')
+        assert first.status_code == again.status_code == 200
+        session.fetch(mock.url, params={'q': 'x'})
+    assert mock.stats()['requests'] == 2
+
+
+def test_session_replays_cached_errors(mock):
+    url = mock.url
+    mock.close()
+    with ScanSession(timeout=1) as session:
+        with pytest.raises(requests.exceptions.RequestException):
+            session.fetch(url)
+        with pytest.raises(requests.exceptions.RequestException):
+            session.fetch(url + '/')
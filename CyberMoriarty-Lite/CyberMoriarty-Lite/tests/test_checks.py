@@ -0,0 +1,47 @@
+import pytest
+
+from core.checks import CHECKS, available_checks, plan, plan_stages, select_checks
+
+
+def assert_dependencies_first(stages):
+    stage_of = {name: i for i, stage in enumerate(stages) for name in stage}
+    for name, stage in stage_of.items():
+        for dep in CHECKS[name].requires:
+            if dep in stage_of:
+                assert stage_of[dep] < stage, f'{dep} must run before {name}'
+
+
+def test_default_plan_stages():
+    stages = plan_stages()
+    assert stages == [['dns', 'root', 'admin', 'xss'], ['recon', 'headers']]
+    assert_dependencies_first(stages)
+
+
+@pytest.mark.parametrize('selected', [['headers'], ['recon'], ['ports', 'headers'],
+                                      available_checks()])
+def test_dependencies_run_in_earlier_stages(selected):
+    stages = plan_stages(selected)
+    names = [name for stage in stages for name in stage]
+    assert len(names) == len(set(names))
+    assert set(selected) <= set(names)
+    assert_dependencies_first(stages)
+
+
+def test_done_checks_are_left_out():
+    assert plan_stages(['recon'], done=['dns']) == [['root'], ['recon']]
+    assert plan_stages(['headers'], done=['root']) == [['headers']]
+    assert plan_stages(['headers'], done=['root', 'headers']) == []
+
+
+def test_plan_is_dependency_ordered_and_deduplicated():
+    order = plan('recon,headers')
+    assert order.index('dns') < order.index('recon')
+    assert order.index('root') < order.index('recon')
+    assert order.count('root') == 1
+
+
+def test_unknown_check_rejected():
+    with pytest.raises(ValueError):
+        plan_stages(['nope'])
+    with pytest.raises(ValueError):
+        select_checks('dns')  # internal step, not selectable
@@ -0,0 +1,59 @@
+import json
+
+from core.output import JsonlWriter, load_completed
+
+
+def write_records(path, targets):
+    with JsonlWriter(str(path)) as writer:
+        for target in targets:
+            writer.write({'target': target})
+
+
+def test_resume_skips_completed(tmp_path):
+    path = tmp_path / 'out.jsonl'
+    write_records(path, ['https://a.example', 'b.example'])
+    with JsonlWriter(str(path), resume=True) as writer:
+        assert writer.completed == {'a.example', 'b.example'}
+        writer.write({'target': 'c.example'})
+    assert [json.loads(line)['target'] for line in path.read_text().splitlines()] == [
+        'https://a.example', 'b.example', 'c.example']
+
+
+def test_resume_truncates_partial_last_line(tmp_path):
+    path = tmp_path / 'out.jsonl'
+    write_records(path, ['a.example', 'b.example'])
+    with open(path, 'a', encoding='utf-8') as fh:
+        fh.write('{"target": "c.exam')
+    with JsonlWriter(str(path), resume=True) as writer:
+        assert writer.completed == {'a.example', 'b.example'}
+        writer.write({'target': 'c.example'})
+    lines = path.read_text().splitlines()
+    assert [json.loads(line)['target'] for line in lines] == ['a.example', 'b.example',
+                                                              'c.example']
+
+
+def test_resume_partial_line_longer_than_read_block(tmp_path):
+    path = tmp_path / 'out.jsonl'
+    write_records(path, ['a.example'])
+    with open(path, 'a', encoding='utf-8') as fh:
+        fh.write('{"target": "b.example", "pad": "' + 'x' * 10000)
+    JsonlWriter(str(path), resume=True).close()
+    assert path.read_text() == '{"target":"a.example"}\n'
+
+
+def test_resume_file_with_only_a_partial_line(tmp_path):
+    path = tmp_path / 'out.jsonl'
+    path.write_text('{"targ')
+    with JsonlWriter(str(path), resume=True) as writer:
+        assert writer.completed == set()
+    assert path.read_text() == ''
+
+
+def test_resume_missing_file_and_fresh_write(tmp_path):
+    path = tmp_path / 'out.jsonl'
+    assert load_completed(str(path)) == set()
+    with JsonlWriter(str(path), resume=True) as writer:
+        writer.write({'target': 'a.example'})
+    # Without resume the file starts over
+    write_records(path, ['b.example'])
+    assert load_completed(str(path)) == {'b.example'}
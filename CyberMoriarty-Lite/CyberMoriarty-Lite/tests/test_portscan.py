@@ -0,0 +1,55 @@
+import pytest
+
+from core.portscan import MAX_CIDR_ADDRESSES, PORT_SETS, parse_network, parse_ports
+
+
+def test_parse_ports_default_is_common_set():
+    assert parse_ports() == list(PORT_SETS['common'])
+
+
+def test_parse_ports_mixes_sets_ranges_and_singles():
+    ports = parse_ports('web, 22,8000-8002 22')
+    assert ports == sorted(set(PORT_SETS['web']) | {22, 8000, 8001, 8002})
+
+
+def test_parse_ports_accepts_ints():
+    assert parse_ports([443, 80, 80]) == [80, 443]
+
+
+def test_parse_ports_range_limits():
+    assert parse_ports('1') == [1]
+    assert parse_ports('65535') == [65535]
+    assert len(parse_ports('1-65535')) == 65535
+    for spec in ('0', '65536', '10-5', '0-80', '80-70000'):
+        with pytest.raises(ValueError):
+            parse_ports(spec)
+
+
+def test_parse_ports_rejects_junk_and_empty():
+    for spec in ('http', 'abc-def', '', ' , '):
+        with pytest.raises(ValueError):
+            parse_ports(spec)
+
+
+def test_parse_network_addresses_and_blocks():
+    assert parse_network('192.0.2.7').num_addresses == 1
+    assert parse_network('192.0.2.0/24').num_addresses == 256
+    # Host bits set are allowed
+    assert str(parse_network('192.0.2.9/30')) == '192.0.2.8/30'
+    assert parse_network('2001:db8::/120').num_addresses == 256
+
+
+def test_parse_network_names_are_not_networks():
+    assert parse_network('example.com') is None
+    assert parse_network('http://192.0.2.1/') is None
+
+
+def test_parse_network_size_limit():
+    assert parse_network('10.0.0.0/16').num_addresses == MAX_CIDR_ADDRESSES
+    with pytest.raises(ValueError):
+        parse_network('10.0.0.0/15')
+    with pytest.raises(ValueError):
+        parse_network('2001:db8::/64')
+    assert parse_network('10.0.0.0/8', max_addresses=1 << 24).num_addresses == 1 << 24
+    with pytest.raises(ValueError):
+        parse_network('192.0.2.0/24', max_addresses=255)
@@ -0,0 +1,58 @@
+import pickle
+
+import pytest
+
+from core.results import (AdminResult, HeadersResult, PortProbe, PortsResult, ReconResult,
+                          XssResult)
+
+SAMPLES = [
+    ReconResult(host='example.com', ip='192.0.2.1', ipv4=['192.0.2.1'], ipv6=[],
+                final_url='https://example.com/', status_code=200, uses_https=True,
+                schemes={'http': {'status_code': 301}, 'https': {'status_code': 200}}),
+    HeadersResult(missing=['Content-Security-Policy']),
+    HeadersResult(error='timed out'),
+    AdminResult(found=['/admin'], login_gated=['/wp-admin'], catch_all=False, probed=12,
+                pages={'/admin': {'status': 200, 'length': 4096}}),
+    XssResult(params=[]),
+    PortsResult(address='192.0.2.1', open=[22, 443]),
+    PortProbe(host='example.com', address='192.0.2.1', port=81, state='filtered',
+              seconds=1.0, error='ETIMEDOUT'),
+]
+
+
+@pytest.mark.parametrize('result', SAMPLES, ids=lambda r: type(r).__name__)
+def test_dict_round_trip(result):
+    data = result.to_dict()
+    assert None not in data.values()
+    assert type(result).from_dict(data) == result
+
+
+@pytest.mark.parametrize('result', SAMPLES, ids=lambda r: type(r).__name__)
+def test_row_and_pickle_round_trip(result):
+    assert type(result).from_row(result.to_row()) == result
+    assert pickle.loads(pickle.dumps(result)) == result
+
+
+def test_empty_lists_are_kept():
+    # [] means "checked, nothing found", unlike a missing field
+    assert XssResult(params=[]).to_dict() == {'params': []}
+    assert not XssResult(params=[]).reflected
+
+
+def test_legacy_list_form():
+    assert HeadersResult.from_dict(['X-Frame-Options']) == HeadersResult(missing=['X-Frame-Options'])
+    assert PortsResult.from_dict([80]).open == [80]
+
+
+def test_unknown_keys_ignored_on_load_rejected_on_build():
+    assert XssResult.from_dict({'params': ['q'], 'extra': 1}) == XssResult(params=['q'])
+    with pytest.raises(TypeError):
+        XssResult(params=[], extra=1)
+
+
+def test_ok_and_recon_error():
+    assert HeadersResult(missing=[]).ok
+    assert not HeadersResult(error='boom').ok
+    assert ReconResult(status_code=200).ok
+    assert ReconResult(https_error='refused').error == 'refused'
+    assert ReconResult().error == 'No HTTP response'
@@ -4,12 +4,15 @@ CyberMoriarty Lite - Web Interface
 A web-based cybersecurity pentesting tool with Taglish assistant interface
 """
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify, url_for
 import threading
 import json
-from core.recon import recon
-from core.scanner import check_security_headers, find_admin_pages, quick_xss_reflection_test
-from assistant import detect_intent, explain_recon, explain_scan_results
+from core.checks import select_checks
+from core.metrics import default_registry
+from core.pipeline import scan_target
+from core.cache import normalize_url
+from assistant import annotate_result, detect_intent
+from jobs import JobManager, QueueFull
 
 app = Flask(__name__)
 
@@ -19,56 +22,135 @@ def index():
 
 @app.route('/scan', methods=['POST'])
 def scan_endpoint():
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
     url = data.get('url', '').strip()
     
     if not url:
         return jsonify({'error': 'Kulang ang URL'}), 400
+
+    # Optional subset of checks, e.g. {"checks": ["headers"]}
+    try:
+        checks = select_checks(data.get('checks'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     try:
-        # Run all scans
-        scan_result = run_full_scan(url)
-        return jsonify(scan_result)
-        
-    except Exception as e:
-        return jsonify({'error': f'Scan error: {str(e)}'}), 500
-
-def run_full_scan(url):
-    """Run comprehensive security scan"""
+        # Queue the scan (or join the same one already running or just
+        # finished); the browser follows progress by job id
+        job = jobs.submit(url, refresh=bool(data.get('refresh')), checks=checks)
+    except QueueFull as e:
+        return jsonify({'error': str(e)}), 503
+
+    return jsonify({
+        'job_id': job.id,
+        'status': job.status,
+        'shared': job.submitters > 1,
+        'status_url': url_for('scan_status', job_id=job.id),
+        'events_url': url_for('scan_events', job_id=job.id),
+    }), 202
+
+@app.route('/scan/cache', methods=['DELETE'])
+def scan_cache_clear():
+    # ?url=example.com drops one target's cached results, no url drops all
+    url = request.args.get('url', '').strip()
+    key = scan_url_key(url) if url else None
+    dropped = jobs.invalidate(None if key is None else lambda k: k[0] == key)
+    return jsonify({'invalidated': dropped})
+
+@app.route('/scan/<job_id>')
+def scan_status(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Walang ganyang scan job'}), 404
+    payload = job.to_dict()
+    if job.result is not None:
+        # ?explain=0 skips the Taglish prose (e.g. for bulk exports)
+        payload['result'] = scan_response(job.result, prose=request.args.get('explain') != '0')
+    return jsonify(payload)
+
+@app.route('/scan/<job_id>/events')
+def scan_events(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Walang ganyang scan job'}), 404
+
+    def stream():
+        for item in job.iter_events():
+            if item is None:
+                # Comment line keeps proxies from closing an idle stream
+                yield ': keepalive\n\n'
+                continue
+            event, payload = item
+            yield f'event: {event}\ndata: {json.dumps(payload, default=str)}\n\n'
+
+    return Response(stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def run_full_scan(url, on_check=None, checks=None):
+    """
+    Run comprehensive security scan (or only the selected checks).
+    The explanations are rendered the first time a client asks for them.
+    """
+    # All checks share one pooled session; on_check reports each as it finishes
+    return annotate_result(scan_target(url, on_check=on_check, checks=checks))
+
+def scan_response(scan, prose=True):
+    """JSON body of a finished scan; prose=False leaves the explanations out"""
+    recon_data = scan.get('recon')
+    headers = scan.get('headers')
+    admin = scan.get('admin')
+    xss = scan.get('xss')
+    ports = scan.get('ports')
+    report = scan.explanation
+
     results = {
-        'url': url,
-        'status': 'scanning',
-        'timestamp': None
-    }
-    
-    # Run reconnaissance
-    recon_data = recon(url)
-    
-    # Run security checks
-    missing_headers = check_security_headers(url)
-    admin_pages = find_admin_pages(url)
-    xss_test = quick_xss_reflection_test(url)
-    
-    # Generate explanations
-    recon_explanation = explain_recon(recon_data)
-    security_explanation = explain_scan_results(missing_headers, admin_pages, xss_test)
-    
-    results.update({
+        'url': scan.target,
         'status': 'completed',
+        'timestamp': scan.scanned_at,
+        'checks': scan.checks,
+        'timings': scan.timings,
+        'metrics': scan.metrics,
         'recon': {
-            'data': recon_data,
-            'explanation': recon_explanation
+            'data': recon_data.to_dict() if recon_data is not None else None,
         },
         'security': {
-            'missing_headers': missing_headers,
-            'admin_pages': admin_pages,
-            'xss_possible': xss_test,
-            'explanation': security_explanation
+            'missing_headers': headers.missing if headers is not None else None,
+            'headers_error': headers.error if headers is not None else None,
+            'admin_pages': admin.found if admin is not None else None,
+            'xss_possible': xss.params if xss is not None else None,
+            'open_ports': ports.open if ports is not None else None,
         }
-    })
-    
+    }
+    if prose:
+        results['recon']['explanation'] = report.recon
+        results['security']['explanation'] = report.security
     return results
 
+def scan_url_key(url):
+    """
+    Normalized target URL, keeping scheme and path: those change what the
+    checks probe. A bare domain (both schemes raced) stays scheme-less.
+    """
+    return normalize_url(url if url.startswith('http') else '//' + url)
+
+def scan_key(url, options):
+    """Requests for the same URL and set of checks are the same scan"""
+    return scan_url_key(url), tuple(sorted(options.get('checks') or ()))
+
+# Bounded worker pool so slow targets never pin request threads; identical
+# requests share one scan, and its result is reused for a minute
+jobs = JobManager(run_full_scan, max_workers=4, max_pending=32, key=scan_key,
+                  ttl=60, cache_size=256)
+
+@app.route('/metrics')
+def metrics_endpoint():
+    # Prometheus text format: scan totals plus the current job queue
+    counts = jobs.counts()
+    gauges = [('moriarty_jobs', {'status': status}, counts.get(status, 0))
+              for status in ('queued', 'running', 'completed', 'failed')]
+    return Response(default_registry.render_prometheus(gauges),
+                    mimetype='text/plain; version=0.0.4')
+
 @app.route('/help')
 def help_endpoint():
     help_info = {